@@ -0,0 +1,156 @@
+import time
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+from loguru import logger
+
+from git_agent.application.orchestrator import ModelRunResult, ReviewOrchestrator
+from git_agent.application.sharding import PreparedShard
+from git_agent.domain.models import ApprovalStatus, CodeReviewResult, ReviewContext
+from git_agent.infra.endpoint_pool import model_key
+
+DEFAULT_MIN_CONFIDENCE = 0.7
+DEFAULT_MAX_CHANGED_LINES = 400
+
+
+class CascadeDecision(StrEnum):
+    Accepted = "accepted"
+    Escalated = "escalated"
+    # The last model ran; its review stands whatever the verdict.
+    Final = "final"
+    Failed = "failed"
+    Skipped = "skipped"
+
+
+@dataclass
+class CascadePolicy:
+    """When a cheaper model's review is not enough and the next model must run."""
+
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    # Larger diffs skip the cheaper models and go straight to the last one.
+    max_changed_lines: int = DEFAULT_MAX_CHANGED_LINES
+
+    def escalation_reason(self, review: CodeReviewResult) -> str | None:
+        if review.approval_status != ApprovalStatus.Approved:
+            return review.approval_status.value
+        # Models that leave out the optional confidence are taken at their word.
+        if review.confidence is not None and review.confidence < self.min_confidence:
+            return f"confidence {review.confidence:.2f}"
+        return None
+
+
+@dataclass
+class CascadeStep:
+    model: str
+    decision: CascadeDecision
+    reason: str = ""
+    duration_seconds: float = 0.0
+    status: ApprovalStatus | None = None
+
+
+@dataclass
+class CascadeResult:
+    result: ModelRunResult | None
+    steps: list[CascadeStep] = field(default_factory=list)
+    # Model time the skipped models would have taken, scaled by size from the one that answered.
+    estimated_seconds_saved: float = 0.0
+
+
+def changed_lines(context: ReviewContext) -> int:
+    return sum(d.additions + d.deletions for d in context.file_diffs.values())
+
+
+class ReviewCascade:
+    """
+    Tries models from cheapest to most expensive, in the order given, and stops at the
+    first one that approves with enough confidence. Most small changes never reach
+    the larger models.
+    """
+
+    def __init__(
+        self,
+        orchestrator: ReviewOrchestrator,
+        policy: CascadePolicy | None = None,
+        sizes: dict[str, int] | None = None,
+    ):
+        self.orchestrator = orchestrator
+        self.policy = policy or CascadePolicy()
+        self.sizes = sizes or {}
+
+    async def run(
+        self, models: list[str], shards: list[PreparedShard], context: ReviewContext
+    ) -> CascadeResult:
+        outcome = CascadeResult(result=None)
+        remaining = list(models)
+
+        lines = changed_lines(context)
+        if len(remaining) > 1 and lines > self.policy.max_changed_lines:
+            reason = f"{lines} changed lines"
+            logger.info(f"Cascade: {reason}, going straight to {remaining[-1]}")
+            outcome.steps += [
+                CascadeStep(m, CascadeDecision.Skipped, reason) for m in remaining[:-1]
+            ]
+            remaining = remaining[-1:]
+
+        while remaining:
+            model = remaining.pop(0)
+            start = time.perf_counter()
+            [result] = await self.orchestrator.run([model], shards)
+            duration = time.perf_counter() - start
+
+            if result is None:
+                outcome.steps.append(
+                    CascadeStep(model, CascadeDecision.Failed, "no review", duration)
+                )
+                continue
+
+            outcome.result = result
+            status = result.review.approval_status
+            reason = self.policy.escalation_reason(result.review)
+
+            if not remaining:
+                outcome.steps.append(
+                    CascadeStep(
+                        model,
+                        CascadeDecision.Final,
+                        reason or status.value,
+                        duration,
+                        status,
+                    )
+                )
+                break
+
+            if reason is None:
+                outcome.steps.append(
+                    CascadeStep(
+                        model, CascadeDecision.Accepted, status.value, duration, status
+                    )
+                )
+                outcome.steps += [
+                    CascadeStep(m, CascadeDecision.Skipped, f"{model} approved")
+                    for m in remaining
+                ]
+                break
+
+            logger.info(
+                f"Cascade: {model} returned {reason}, escalating to {remaining[0]}"
+            )
+            outcome.steps.append(
+                CascadeStep(model, CascadeDecision.Escalated, reason, duration, status)
+            )
+
+        if outcome.result:
+            outcome.estimated_seconds_saved = sum(
+                self._estimate(step.model, outcome.result)
+                for step in outcome.steps
+                if step.decision == CascadeDecision.Skipped
+            )
+        return outcome
+
+    def _estimate(self, model: str, reference: ModelRunResult) -> float:
+        size = self.sizes.get(model_key(model))
+        reference_size = self.sizes.get(model_key(reference.model))
+        # Generation time grows roughly with the weights read per token.
+        if size and reference_size:
+            return reference.duration_seconds * size / reference_size
+        return reference.duration_seconds
@@ -0,0 +1,100 @@
+import ast
+import re
+from dataclasses import dataclass, field
+
+from git_agent.domain.models import FileContext, FileDiff
+
+LineRange = tuple[int, int]
+
+HUNK_NEW_RANGE_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))?")
+
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def context_ranges(
+    info: FileContext, file_diff: FileDiff, window: int, max_scope_lines: int = 150
+) -> list[LineRange]:
+    """Returns merged 1-based inclusive line ranges to show around each hunk."""
+    ranges: list[LineRange] = []
+    scopes = _python_scopes(info.content) if info.language == "Python" else []
+
+    for hunk in file_diff.hunks:
+        # A pure deletion sits between new_start and the line after it.
+        last = hunk.new_end + (hunk.new_count == 0)
+        start = max(1, hunk.new_start - window)
+        end = min(info.line_count, last + window)
+
+        scope = _innermost_scope(scopes, hunk.new_start, hunk.new_end)
+        if scope and scope[1] - scope[0] < max_scope_lines:
+            start = min(start, scope[0])
+            end = max(end, min(info.line_count, scope[1]))
+
+        if start <= end:
+            ranges.append((start, end))
+
+    return merge_ranges(ranges)
+
+
+@dataclass
+class LineMarks:
+    """Where a file's diff lands in the new file, for marking changes inline."""
+
+    added: set[int] = field(default_factory=set)
+    # Removed lines, keyed by the new line number they used to precede.
+    removed: dict[int, list[str]] = field(default_factory=dict)
+
+
+def line_marks(file_diff: FileDiff) -> LineMarks:
+    marks = LineMarks()
+    line = 0
+    in_hunk = False
+
+    for text in file_diff.patch.splitlines():
+        if text.startswith("@@"):
+            match = HUNK_NEW_RANGE_RE.match(text)
+            in_hunk = match is not None
+            if match:
+                # An empty new range starts at the line before the deletion.
+                line = int(match.group(1)) + (match.group(2) == "0")
+        elif not in_hunk or text.startswith("\\"):
+            continue
+        elif text.startswith("+"):
+            marks.added.add(line)
+            line += 1
+        elif text.startswith("-"):
+            marks.removed.setdefault(line, []).append(text[1:])
+        else:
+            line += 1
+
+    return marks
+
+
+def merge_ranges(ranges: list[LineRange]) -> list[LineRange]:
+    merged: list[LineRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _python_scopes(content: str) -> list[LineRange]:
+    try:
+        tree = ast.parse(content)
+    except SyntaxError, ValueError:
+        return []
+
+    scopes: list[LineRange] = []
+    for node in ast.walk(tree):
+        if isinstance(node, SCOPE_NODES) and node.end_lineno is not None:
+            first = min([d.lineno for d in node.decorator_list] + [node.lineno])
+            scopes.append((first, node.end_lineno))
+    return scopes
+
+
+def _innermost_scope(scopes: list[LineRange], start: int, end: int) -> LineRange | None:
+    enclosing = [s for s in scopes if s[0] <= start and end <= s[1]]
+    if not enclosing:
+        return None
+    return min(enclosing, key=lambda s: s[1] - s[0])
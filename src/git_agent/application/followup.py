@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from git_agent.application.sharding import PreparedShard
+from git_agent.domain.models import CodeReviewResult
+from git_agent.domain.ports import AsyncLLMProvider, Endpoint
+
+DEFAULT_KEEP_ALIVE = "30m"
+
+FOLLOW_UP_INSTRUCTIONS = (
+    "Answer follow-up questions about your review in plain prose, not JSON. "
+    "Refer to file paths and line numbers from the File Context."
+)
+
+
+def shard_for(question: str, shards: Sequence[PreparedShard]) -> int | None:
+    """The shard holding most of the files the question names, if it names any."""
+    mentions = [
+        sum(path in question for path in shard.context.files_changed)
+        for shard in shards
+    ]
+    best = max(range(len(mentions)), key=mentions.__getitem__)
+    return best if mentions[best] else None
+
+
+class FollowUpSession:
+    """
+    A chat about a finished review. The prompt of the shard in question and the merged
+    review open the conversation, and go to the host that reviewed that shard, so
+    Ollama finds the prompt in its KV cache and each question only costs its own tokens.
+    """
+
+    def __init__(
+        self,
+        llm_provider: AsyncLLMProvider,
+        model: str,
+        shards: list[PreparedShard],
+        review: CodeReviewResult,
+        hosts: Sequence[str | None] = (),
+    ):
+        self.llm_provider = llm_provider
+        self.model = model
+        self.shards = shards
+        self.review = review
+        self.hosts = hosts
+        self.shard_index = 0
+        self.messages: list[dict[str, str]] = []
+
+    async def ask(self, question: str) -> str:
+        # A question about files of another shard starts over with that shard's prompt.
+        index = shard_for(question, self.shards)
+        if not self.messages or (index is not None and index != self.shard_index):
+            self._open(self.shard_index if index is None else index)
+
+        # Sent with the first question rather than changing the cached system prompt.
+        if len(self.messages) == 3:
+            question = f"{FOLLOW_UP_INSTRUCTIONS}\n\n{question}"
+
+        self.messages.append({"role": "user", "content": question})
+        try:
+            answer = await self._chat()
+        except Exception:
+            self.messages.pop()
+            raise
+
+        self.messages.append({"role": "assistant", "content": answer})
+        return answer
+
+    def _open(self, index: int) -> None:
+        shard = self.shards[index]
+        self.shard_index = index
+        self.messages = [
+            {"role": "system", "content": shard.review.system},
+            {"role": "user", "content": shard.review.prompt},
+            {"role": "assistant", "content": self.review.model_dump_json()},
+        ]
+
+    async def _chat(self) -> str:
+        pool = self.llm_provider.pool
+        endpoint = self._served_by()
+        if endpoint is not None:
+            try:
+                return await self.llm_provider.chat(self.messages, endpoint=endpoint)
+            except ConnectionError:
+                # The next question goes to whichever host the pool picks.
+                pool.mark_down(endpoint)
+                raise
+        async with pool.lease(self.model) as endpoint:
+            return await self.llm_provider.chat(self.messages, endpoint=endpoint)
+
+    def _served_by(self) -> Endpoint | None:
+        """The healthy host that reviewed the current shard; None for cached answers."""
+        if self.shard_index >= len(self.hosts):
+            return None
+        host = self.hosts[self.shard_index]
+        return next(
+            (
+                e
+                for e in self.llm_provider.pool.endpoints
+                if e.host == host and e.healthy
+            ),
+            None,
+        )
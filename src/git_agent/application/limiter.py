@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from loguru import logger
+
+from git_agent.domain.models import ServerTiming
+
+# Ollama's own default for OLLAMA_NUM_PARALLEL on most machines. The server's value
+# is not exposed over its API, so the limit starts here and adapts.
+DEFAULT_INITIAL_LIMIT = 2
+DECREASE_FACTOR = 0.5
+
+# Failures that say the host is overloaded rather than that the answer was bad.
+CONGESTION_ERRORS = (ConnectionError, TimeoutError)
+
+# Share of its server time a request may wait in the server's queue before the limit
+# shrinks. Plain latency is not a signal: shards differ in size.
+QUEUEING_RATIO = 0.5
+
+
+@dataclass
+class Slot:
+    """A granted slot. The caller reports the server's timing of the request, if known."""
+
+    timing: ServerTiming | None = None
+
+    @property
+    def queued(self) -> bool:
+        return (
+            self.timing is not None
+            and self.timing.queued_seconds > QUEUEING_RATIO * self.timing.busy_seconds
+        )
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight requests to one endpoint. While demand exceeds the limit,
+    successes raise it (doubling per round trip until the first congestion signal,
+    then one per round trip); a request the server kept queued lowers it by one, and a
+    connection error, timeout or 503 halves it. Waiting requests are served round-robin
+    across models so one model's shards cannot starve another.
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = 1,
+        max_limit: int = 8,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.in_flight = 0
+        self._slow_start = True
+        self._growth = 0.0
+        self._last_decrease = 0.0
+        self._waiters: dict[str, deque[asyncio.Future[None]]] = {}
+        self._turns: deque[str] = deque()
+
+    @asynccontextmanager
+    async def slot(self, model: str) -> AsyncIterator[Slot]:
+        await self._acquire(model)
+        started = time.monotonic()
+        slot = Slot()
+        congested: bool | None = None
+
+        try:
+            yield slot
+            congested = False
+        except CONGESTION_ERRORS:
+            congested = True
+            raise
+        finally:
+            self.in_flight -= 1
+            # Cancelled or failed for other reasons: no signal about the endpoint.
+            if congested is not None:
+                self._adjust(started, congested, slot.queued)
+            self._wake()
+
+    async def _acquire(self, model: str) -> None:
+        if self.in_flight < self.limit and not self._turns:
+            self.in_flight += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue = self._waiters.setdefault(model, deque())
+        if not queue:
+            self._turns.append(model)
+        queue.append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._discard(model, future)
+            else:
+                # The slot was granted just as we were cancelled; hand it on.
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def _wake(self) -> None:
+        while self._turns and self.in_flight < self.limit:
+            model = self._turns.popleft()
+            queue = self._waiters[model]
+            future = queue.popleft()
+            if queue:
+                self._turns.append(model)
+            else:
+                del self._waiters[model]
+
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _discard(self, model: str, future: asyncio.Future[None]) -> None:
+        queue = self._waiters.get(model)
+        if queue and future in queue:
+            queue.remove(future)
+            if not queue:
+                del self._waiters[model]
+                self._turns.remove(model)
+
+    def _adjust(self, started: float, congested: bool, queued: bool) -> None:
+        # Requests sent before the last decrease reflect the old limit.
+        if started < self._last_decrease:
+            return
+
+        if queued and not congested:
+            # The server already holds more than it runs at once; back off gently.
+            self._slow_start = False
+            self._growth = 0.0
+            if self.limit > self.min_limit:
+                self._last_decrease = time.monotonic()
+                self.limit -= 1
+                logger.debug(
+                    f"Endpoint queueing requests, limit lowered to {self.limit}"
+                )
+            return
+
+        if congested:
+            self._slow_start = False
+            self._last_decrease = time.monotonic()
+            previous, self.limit = (
+                self.limit,
+                max(self.min_limit, int(self.limit * DECREASE_FACTOR)),
+            )
+            logger.debug(f"Endpoint congested, limit {previous} -> {self.limit}")
+            return
+
+        # Only grow while requests are actually waiting for a slot.
+        if not self._turns or self.limit >= self.max_limit:
+            return
+
+        self._growth += 1.0 if self._slow_start else 1.0 / self.limit
+        if self._growth >= 1.0:
+            self._growth = 0.0
+            self.limit += 1
+            logger.debug(f"Endpoint keeping up, limit raised to {self.limit}")
@@ -0,0 +1,42 @@
+from git_agent.domain.models import FileDiff, LintScore, LintScoreIssue
+
+
+def restrict_to_changes(
+    lint: LintScore, file_diffs: dict[str, FileDiff], margin: int = 3
+) -> LintScore:
+    """
+    Keeps findings on or within `margin` lines of a changed line.
+    Findings without a line (tool errors) and files without hunk data are always kept.
+    """
+    kept: list[LintScoreIssue] = []
+    outside_by_file = dict(lint.outside_by_file)
+
+    for issue in lint.issues:
+        file_diff = file_diffs.get(issue.file)
+        if (
+            issue.line is None
+            or file_diff is None
+            or _near_change(issue.line, file_diff, margin)
+        ):
+            kept.append(issue)
+        else:
+            outside_by_file[issue.file] = outside_by_file.get(issue.file, 0) + 1
+
+    by_language: dict[str, list[LintScoreIssue]] = {}
+    for issue in kept:
+        by_language.setdefault(issue.language, []).append(issue)
+
+    return LintScore(
+        issues=kept,
+        by_language=by_language,
+        linters_used=lint.linters_used,
+        outside_changes=sum(outside_by_file.values()),
+        outside_by_file=outside_by_file,
+    )
+
+
+def _near_change(line: int, file_diff: FileDiff, margin: int) -> bool:
+    return any(
+        hunk.new_start - margin <= line <= hunk.new_end + margin
+        for hunk in file_diff.hunks
+    )
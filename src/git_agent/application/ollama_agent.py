@@ -1,57 +1,281 @@
-import json
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass, replace
 
 from loguru import logger
+from pydantic import ValidationError
 
-from git_agent.application.prompt_builder import PromptBuilder
-from git_agent.domain.models import CodeReviewResult, ReviewContext
-from git_agent.domain.ports import CodeReviewAgent
-from git_agent.domain.prompts import SENIOR_DEV_PROMPT
-from git_agent.infra.ollama_llm_provider import OllamaLLMProvider
+from git_agent.application.prompt_builder import PromptBuilder, PromptOptions
+from git_agent.application.response_repair import (
+    MISSING_FIELDS_MAX_TOKENS,
+    missing_fields_messages,
+    missing_fields_schema,
+    parse_fields,
+    repair_review,
+)
+from git_agent.application.tokens import prompt_token_budget
+from git_agent.domain.models import (
+    CodeIssue,
+    CodeReviewResult,
+    PromptEvalStats,
+    ReviewContext,
+)
+from git_agent.domain.ports import (
+    AsyncLLMProvider,
+    Endpoint,
+    EndpointPool,
+    ItemCallback,
+    PreparedRequest,
+    PromptBatcher,
+    TokenEstimator,
+)
+from git_agent.domain.prompts import SENIOR_DEV_PROMPT, system_prompt
+from git_agent.infra import endpoint_pool
+from git_agent.infra.http_client import HostClient
+from git_agent.infra.json_stream import replay
+from git_agent.infra.llm_cache import LLMResponseCache
+from git_agent.infra.ollama_llm_provider import (
+    DEFAULT_NUM_CTX,
+    DEFAULT_NUM_PREDICT,
+    AsyncOllamaLLMProvider,
+    prepare,
+)
+from git_agent.infra.prompt_eval_store import PromptEvalBaselines
 
+IssueCallback = Callable[[CodeIssue], None]
+# `ollama_llm_provider.prepare` or the equivalent of another backend.
+RequestPreparer = Callable[..., PreparedRequest]
 
-class OllamaCodeReviewAgent(CodeReviewAgent):
-    def __init__(self, model: str, ollama_host: str = "http://localhost:11434"):
-        self.llm_provider = OllamaLLMProvider(host=ollama_host, model=model)
+STREAMED_ISSUE_KEYS = {"critical_bugs", "warnings"}
 
-        if not self.llm_provider.is_available():
-            logger.warning("LLM Provider is not available during initialization.")
 
-    def review_with_context(
-        self, context: ReviewContext, user_context: str = ""
-    ) -> CodeReviewResult:
-        logger.debug(f"Reviewing {len(context.files_changed)} files...")
+@dataclass(frozen=True)
+class PreparedReview:
+    """A review request built once and shared by every model that reviews it."""
+
+    request: PreparedRequest
+    estimated_tokens: int
+    build_seconds: float
+    dropped: tuple[str, ...] = ()
+    # The user prompt as text, to replay it when asking for missing fields.
+    prompt: str = ""
+    system: str = SENIOR_DEV_PROMPT
+    # Estimated tokens compact mode saved, system prompt included.
+    saved_tokens: int = 0
+
+
+def budgeted_options(
+    options: PromptOptions, num_ctx: int, estimator: TokenEstimator
+) -> PromptOptions:
+    if options.token_budget is not None:
+        return options
+
+    budget = prompt_token_budget(
+        num_ctx, DEFAULT_NUM_PREDICT, system_prompt(options.compact), estimator
+    )
+    return replace(options, token_budget=budget)
+
+
+def prepare_review(
+    context: ReviewContext,
+    user_context: str,
+    options: PromptOptions,
+    estimator: TokenEstimator,
+    num_ctx: int = DEFAULT_NUM_CTX,
+    stream: bool = False,
+    preparer: RequestPreparer = prepare,
+) -> PreparedReview:
+    built = PromptBuilder.build_prompt(
+        context, user_context, budgeted_options(options, num_ctx, estimator), estimator
+    )
+    system = system_prompt(options.compact)
+    request = preparer(built.text, system=system, num_ctx=num_ctx, stream=stream)
+    stable = "\0".join([system, str(num_ctx), built.stable_hash])
+    request = replace(
+        request,
+        estimated_tokens=built.estimated_tokens + estimator.count(system),
+        stable_fingerprint=hashlib.sha256(stable.encode("utf-8")).hexdigest(),
+    )
+    saved_tokens = built.saved_tokens
+    if options.compact:
+        saved_tokens += estimator.count(SENIOR_DEV_PROMPT) - estimator.count(system)
+    return PreparedReview(
+        request=request,
+        estimated_tokens=built.estimated_tokens,
+        build_seconds=built.build_seconds,
+        dropped=tuple(built.dropped),
+        prompt=built.text,
+        system=system,
+        saved_tokens=saved_tokens,
+    )
+
+
+class AsyncCodeReviewAgent:
+    """Reviews prepared requests on an event loop with any async backend; pair it with `ReviewOrchestrator`."""
 
-        prompt = PromptBuilder.build(context, user_context)
+    def __init__(self, model: str, llm_provider: AsyncLLMProvider):
+        self.model = model
+        self.llm_provider = llm_provider
 
+    @property
+    def pool(self) -> EndpointPool[Endpoint]:
+        return self.llm_provider.pool
+
+    @property
+    def batches_prompts(self) -> bool:
+        provider = self.llm_provider
+        return isinstance(provider, PromptBatcher) and provider.batch_prompts
+
+    @property
+    def prompt_eval(self) -> PromptEvalStats | None:
+        return self.llm_provider.prompt_eval
+
+    async def cached_review(
+        self,
+        context: ReviewContext,
+        prepared: PreparedReview,
+        on_issue: IssueCallback | None = None,
+    ) -> CodeReviewResult | None:
+        """A review from the response cache; it needs no endpoint or slot."""
+        raw = await self.llm_provider.cached(prepared.request)
+        if raw is None:
+            return None
         try:
-            llm_response = self.llm_provider.generate(
-                prompt=prompt, system=SENIOR_DEV_PROMPT
+            review = parse_review(raw)
+        except ValueError:
+            return None
+        replay(raw, _issue_forwarder(on_issue))
+        return _with_context_metadata(review, context)
+
+    async def review_prepared(
+        self,
+        context: ReviewContext,
+        prepared: PreparedReview,
+        on_issue: IssueCallback | None = None,
+        endpoint: Endpoint | None = None,
+    ) -> CodeReviewResult:
+        logger.debug(f"[{self.model}] Reviewing {len(context.files_changed)} files...")
+
+        try:
+            llm_response = await self.llm_provider.generate_prepared(
+                prepared.request, on_item=_issue_forwarder(on_issue), endpoint=endpoint
             )
         except Exception as e:
             logger.error(f"LLM generation failed: {e}")
             raise
 
-        review = self._parse_llm_response(llm_response)
+        review = await self._parse_or_repair(llm_response, prepared, endpoint)
+        return _with_context_metadata(review, context)
 
-        review.files_reviewed = len(context.files_changed)
-        review.languages_detected = list(
-            {info.language for info in context.file_contents.values()}
+    async def review_batch(
+        self,
+        items: list[tuple[ReviewContext, PreparedReview]],
+        endpoint: Endpoint | None = None,
+    ) -> list[CodeReviewResult]:
+        """Reviews several prompts as one batch; only for backends that batch prompts."""
+        provider = self.llm_provider
+        if not isinstance(provider, PromptBatcher):
+            raise TypeError(f"{type(provider).__name__} cannot batch prompts")
+
+        logger.debug(f"[{self.model}] Reviewing {len(items)} prompts as one batch...")
+        responses = await provider.generate_batch(
+            [prepared.request for _, prepared in items], endpoint
         )
+        return [
+            _with_context_metadata(
+                await self._parse_or_repair(response, prepared, endpoint), context
+            )
+            for (context, prepared), response in zip(items, responses, strict=True)
+        ]
 
-        return review
+    async def _parse_or_repair(
+        self, raw: str, prepared: PreparedReview, endpoint: Endpoint | None
+    ) -> CodeReviewResult:
+        """
+        Repairs a malformed response instead of failing the run. Only fields that could
+        not be salvaged are requested again, in a short follow-up on the same context.
+        """
+        try:
+            return parse_review(raw)
+        except ValueError:
+            logger.warning(f"[{self.model}] Malformed review, repairing it")
 
-    def _parse_llm_response(self, raw_response: str) -> CodeReviewResult:
-        logger.debug("Parsing LLM response...")
+        repaired = repair_review(raw)
+        if repaired.missing:
+            logger.info(f"[{self.model}] Asking only for {', '.join(repaired.missing)}")
+            answer = await self.llm_provider.chat(
+                missing_fields_messages(
+                    prepared.prompt, raw, repaired.missing, prepared.system
+                ),
+                schema=missing_fields_schema(repaired.missing),
+                max_tokens=MISSING_FIELDS_MAX_TOKENS,
+                endpoint=endpoint,
+            )
+            repaired.complete(parse_fields(answer))
+        return repaired.to_result()
 
-        try:
-            data = json.loads(raw_response)
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON from model: {e!s}")
-            raise ValueError(f"Model did not return valid JSON: {e}") from None
+    async def release(self) -> None:
+        await self.llm_provider.release()
+
+
+class AsyncOllamaCodeReviewAgent(AsyncCodeReviewAgent):
+    def __init__(
+        self,
+        model: str,
+        ollama_host: str = "http://localhost:11434",
+        num_ctx: int = DEFAULT_NUM_CTX,
+        client: HostClient | None = None,
+        cache: LLMResponseCache | None = None,
+        pool: endpoint_pool.EndpointPool | None = None,
+        keep_alive: str | None = None,
+        baselines: PromptEvalBaselines | None = None,
+    ):
+        super().__init__(
+            model,
+            AsyncOllamaLLMProvider(
+                host=ollama_host,
+                model=model,
+                num_ctx=num_ctx,
+                client=client,
+                cache=cache,
+                pool=pool,
+                keep_alive=keep_alive,
+                baselines=baselines,
+            ),
+        )
+
+
+def parse_review(raw_response: str) -> CodeReviewResult:
+    logger.debug("Parsing LLM response...")
 
+    # Parses and validates in one pass, without an intermediate dict.
+    try:
+        return CodeReviewResult.model_validate_json(raw_response)
+    except ValidationError as e:
+        logger.debug(f"Invalid review from model: {e!s}")
+        raise ValueError(f"Model did not return a valid review: {e}") from None
+
+
+def _issue_forwarder(on_issue: IssueCallback | None) -> ItemCallback | None:
+    if on_issue is None:
+        return None
+
+    def on_item(key: str, raw: str) -> None:
+        if key not in STREAMED_ISSUE_KEYS:
+            return
         try:
-            review = CodeReviewResult(**data)
-            return review
-        except Exception as e:
-            logger.error(f"Schema validation error: {e!s}")
-            raise
+            on_issue(CodeIssue.model_validate_json(raw))
+        except ValidationError:
+            logger.debug(f"Skipping partial issue from stream: {raw}")
+
+    return on_item
+
+
+def _with_context_metadata(
+    review: CodeReviewResult, context: ReviewContext
+) -> CodeReviewResult:
+    review.files_reviewed = len(context.files_changed)
+    review.languages_detected = list(
+        {info.language for info in context.file_contents.values()}
+    )
+    return review
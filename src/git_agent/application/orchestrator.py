@@ -0,0 +1,264 @@
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import partial
+
+from loguru import logger
+
+from git_agent.application.limiter import AdaptiveLimiter
+from git_agent.application.ollama_agent import AsyncCodeReviewAgent
+from git_agent.application.sharding import PreparedShard, merge_reviews
+from git_agent.domain.models import (
+    ApprovalStatus,
+    CodeIssue,
+    CodeReviewResult,
+    PromptEvalStats,
+)
+from git_agent.domain.ports import Endpoint, server_timing
+
+DEFAULT_MAX_PER_ENDPOINT = 8
+
+
+class RunStatus(StrEnum):
+    Queued = "queued"
+    Thinking = "thinking"
+    Done = "done"
+    Failed = "failed"
+    Cancelled = "cancelled"
+
+
+ProgressCallback = Callable[[str, RunStatus], None]
+ModelIssueCallback = Callable[[str, CodeIssue], None]
+AgentFactory = Callable[[str], AsyncCodeReviewAgent]
+
+
+@dataclass
+class ModelRunResult:
+    model: str
+    review: CodeReviewResult
+    duration_seconds: float
+    prompt_eval: PromptEvalStats | None = None
+    # The host that answered each shard, in shard order; None for cached answers.
+    hosts: tuple[str | None, ...] = ()
+
+
+def quorum_verdict(
+    reviews: Iterable[CodeReviewResult], quorum: int
+) -> ApprovalStatus | None:
+    """The approval status at least `quorum` reviews agree on, if any."""
+    counts = Counter(review.approval_status for review in reviews)
+    for status, votes in counts.most_common(1):
+        if votes >= quorum:
+            return status
+    return None
+
+
+class ReviewOrchestrator:
+    """
+    Runs every model's review as a task on one event loop. Requests are bounded per
+    endpoint by an adaptive limit instead of per model, so any number of models and
+    shards can be queued without an OS thread each. With a `quorum`, the models
+    still running are cancelled as soon as that many agree on the approval status.
+    """
+
+    def __init__(
+        self,
+        agent_factory: AgentFactory,
+        max_per_endpoint: int = DEFAULT_MAX_PER_ENDPOINT,
+        max_shards_per_model: int = 2,
+        on_progress: ProgressCallback | None = None,
+        on_issue: ModelIssueCallback | None = None,
+        quorum: int | None = None,
+    ):
+        self.agent_factory = agent_factory
+        self.max_per_endpoint = max_per_endpoint
+        self.max_shards_per_model = max_shards_per_model
+        self.on_progress = on_progress
+        self.on_issue = on_issue
+        self.quorum = quorum
+        self._endpoint_limits: dict[str, AdaptiveLimiter] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._models: list[str] = []
+        self._cancelled: set[str] = set()
+        self._finished: dict[str, ModelRunResult] = {}
+
+    async def run(
+        self,
+        models: list[str],
+        shards: list[PreparedShard],
+        waves: list[list[str]] | None = None,
+    ) -> list[ModelRunResult | None]:
+        """
+        Results follow the order of `models`; failed or cancelled models are None.
+        Waves run one after another, and a model is released from memory once its
+        wave is done unless it is the last wave.
+        """
+        waves = waves or [models]
+        results: dict[str, ModelRunResult | None] = {}
+        self._models = list(models)
+        self._cancelled.clear()
+        self._finished.clear()
+
+        for model in models:
+            self._report(model, RunStatus.Queued)
+
+        for index, wave in enumerate(waves):
+            release = index < len(waves) - 1
+            pending = [m for m in wave if m not in self._cancelled]
+
+            async with asyncio.TaskGroup() as group:
+                self._tasks = {
+                    model: group.create_task(
+                        self._run_model(model, shards, release), name=model
+                    )
+                    for model in pending
+                }
+
+            for model, task in self._tasks.items():
+                results[model] = None if task.cancelled() else task.result()
+
+        for model in self._cancelled.difference(results):
+            self._report(model, RunStatus.Cancelled)
+
+        return [results.get(model) for model in models]
+
+    def cancel(self, models: list[str] | None = None) -> None:
+        """
+        Cancels in-flight reviews, whose closed connections stop generation,
+        and skips models that have not started yet.
+        """
+        self._cancelled.update(models if models is not None else self._models)
+        for model, task in self._tasks.items():
+            if model in self._cancelled:
+                task.cancel()
+
+    async def _run_model(
+        self, model: str, shards: list[PreparedShard], release: bool = False
+    ) -> ModelRunResult | None:
+        agent = self.agent_factory(model)
+        start = time.perf_counter()
+
+        try:
+            answers = await self._review_all(agent, shards)
+        except asyncio.CancelledError:
+            self._report(model, RunStatus.Cancelled)
+            raise
+        except Exception as e:
+            # A TaskGroup wraps child failures; surface the first one.
+            error = e.exceptions[0] if isinstance(e, ExceptionGroup) else e
+            logger.error(f"Model '{model}' failed: {error}")
+            self._report(model, RunStatus.Failed)
+            return None
+        finally:
+            if release:
+                await agent.release()
+
+        result = ModelRunResult(
+            model,
+            merge_reviews([review for review, _ in answers]),
+            time.perf_counter() - start,
+            agent.prompt_eval,
+            tuple(host for _, host in answers),
+        )
+        self._report(model, RunStatus.Done)
+        self._finished[model] = result
+        self._check_quorum()
+        return result
+
+    async def _review_all(
+        self, agent: AsyncCodeReviewAgent, shards: list[PreparedShard]
+    ) -> list[tuple[CodeReviewResult, str | None]]:
+        if agent.batches_prompts and len(shards) > 1:
+            items = [(shard.context, shard.review) for shard in shards]
+
+            async def review_batch(
+                endpoint: Endpoint,
+            ) -> list[tuple[CodeReviewResult, str | None]]:
+                reviews = await agent.review_batch(items, endpoint)
+                return [(review, endpoint.host) for review in reviews]
+
+            return await self._on_endpoint(agent, review_batch)
+
+        shard_limit = asyncio.Semaphore(self.max_shards_per_model)
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(self._review_shard(agent, shard, shard_limit))
+                for shard in shards
+            ]
+        return [task.result() for task in tasks]
+
+    async def _review_shard(
+        self,
+        agent: AsyncCodeReviewAgent,
+        shard: PreparedShard,
+        shard_limit: asyncio.Semaphore,
+    ) -> tuple[CodeReviewResult, str | None]:
+        on_issue = partial(self.on_issue, agent.model) if self.on_issue else None
+
+        async with shard_limit:
+            # Cached answers need no endpoint, and must not skew its limit.
+            cached = await agent.cached_review(shard.context, shard.review, on_issue)
+            if cached is not None:
+                return cached, None
+
+            async def review(endpoint: Endpoint) -> tuple[CodeReviewResult, str | None]:
+                result = await agent.review_prepared(
+                    shard.context, shard.review, on_issue, endpoint
+                )
+                return result, endpoint.host
+
+            return await self._on_endpoint(agent, review)
+
+    async def _on_endpoint[T](
+        self, agent: AsyncCodeReviewAgent, call: Callable[[Endpoint], Awaitable[T]]
+    ) -> T:
+        """Runs `call` within a pool host's limit, moving to another host if it fails."""
+        attempts_left = len(agent.pool.endpoints)
+
+        while True:
+            attempts_left -= 1
+            try:
+                async with (
+                    agent.pool.lease(agent.model) as endpoint,
+                    self._endpoint_limit(endpoint.host).slot(agent.model) as slot,
+                ):
+                    self._report(agent.model, RunStatus.Thinking)
+                    server_timing.set(None)
+                    result = await call(endpoint)
+                    slot.timing = server_timing.get()
+                    return result
+            except ConnectionError:
+                # The pool has marked the host down; the next lease avoids it.
+                if not attempts_left:
+                    raise
+                logger.info(f"[{agent.model}] Retrying on another host")
+
+    def _check_quorum(self) -> None:
+        if not self.quorum:
+            return
+
+        reviews = (result.review for result in self._finished.values())
+        verdict = quorum_verdict(reviews, self.quorum)
+        if verdict is None:
+            return
+
+        running = [m for m in self._models if m not in self._finished]
+        if running and not self._cancelled.issuperset(running):
+            logger.info(
+                f"{self.quorum} models agree on {verdict.value}; cancelling the rest"
+            )
+            self.cancel(running)
+
+    def _endpoint_limit(self, host: str) -> AdaptiveLimiter:
+        if host not in self._endpoint_limits:
+            self._endpoint_limits[host] = AdaptiveLimiter(
+                max_limit=self.max_per_endpoint
+            )
+        return self._endpoint_limits[host]
+
+    def _report(self, model: str, status: RunStatus) -> None:
+        if self.on_progress:
+            self.on_progress(model, status)
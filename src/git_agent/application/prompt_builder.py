@@ -1,56 +1,459 @@
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from enum import StrEnum
+
 from loguru import logger
 
-from git_agent.domain.models import ReviewContext
+from git_agent.application.context_window import (
+    LineMarks,
+    LineRange,
+    context_ranges,
+    line_marks,
+)
+from git_agent.application.tokens import DEFAULT_ESTIMATOR
+from git_agent.domain.models import FileContext, LintScoreIssue, ReviewContext
+from git_agent.domain.ports import TokenEstimator
+
+HUNK_START_RE = re.compile(r"^(?=@@ )", re.MULTILINE)
+
+
+class PromptBudgetError(ValueError):
+    """Not even part of a file's diff fits the token budget."""
+
+    def __init__(self, files: list[str]):
+        self.files = files
+        names = ", ".join(f or "the diff" for f in files)
+        super().__init__(f"The changes in {names} do not fit the token budget")
+
+
+class ContextMode(StrEnum):
+    Full = "full"
+    Hunks = "hunks"
+
+
+class PromptLayout(StrEnum):
+    UserFirst = "user-first"
+    # File context first and the user's note last, so re-runs that only change the
+    # note share the longest possible prefix with Ollama's KV cache.
+    StableFirst = "stable-first"
+
+
+@dataclass(frozen=True)
+class PromptOptions:
+    context_mode: ContextMode = ContextMode.Full
+    context_window: int = 10
+    token_budget: int | None = None
+    layout: PromptLayout = PromptLayout.UserFirst
+    # Marks changes inline in the numbered file view instead of repeating them as a diff.
+    compact: bool = False
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    estimated_tokens: int
+    build_seconds: float
+    dropped: list[str] = field(default_factory=list)
+    # Estimated tokens the compact layout avoided sending.
+    saved_tokens: int = 0
+    # Hash of the prompt without the user's note: what re-runs with another note share.
+    stable_hash: str = ""
+
+
+class _Budget:
+    def __init__(self, estimator: TokenEstimator, limit: int | None):
+        self.estimator = estimator
+        self.remaining = limit
+
+    def cost(self, text: str) -> int:
+        return self.estimator.count(text) if self.remaining is not None else 0
+
+    def reserve(self, tokens: int) -> None:
+        """Charges text that is always sent, even when it does not fit."""
+        if self.remaining is not None:
+            self.remaining = max(0, self.remaining - tokens)
+
+    def take(self, tokens: int) -> bool:
+        if self.remaining is None:
+            return True
+        if tokens > self.remaining:
+            return False
+        self.remaining -= tokens
+        return True
 
 
 class PromptBuilder:
     @staticmethod
-    def build(context: ReviewContext, user_context: str) -> str:
+    def build(
+        context: ReviewContext, user_context: str, options: PromptOptions | None = None
+    ) -> str:
+        return PromptBuilder.build_prompt(context, user_context, options).text
+
+    @staticmethod
+    def build_prompt(
+        context: ReviewContext,
+        user_context: str,
+        options: PromptOptions | None = None,
+        estimator: TokenEstimator | None = None,
+    ) -> BuiltPrompt:
+        """
+        Builds the review prompt, packing sections into the token budget by priority:
+        diff, hunk context, linter findings and finally the rest of each file.
+        """
         logger.debug("Building prompt...")
-        parts: list[str] = []
+        start = time.perf_counter()
+        options = options or PromptOptions()
+        estimator = estimator or DEFAULT_ESTIMATOR
+        budget = _Budget(estimator, options.token_budget)
+        dropped: list[str] = []
 
-        parts.append("# Request Code Review\n")
-        if user_context.strip():
-            parts.append(f"## User Context\n{user_context}\n")
+        header = ["# Request Code Review\n"]
+        note = f"## User Context\n{user_context}\n" if user_context.strip() else ""
+        budget.reserve(budget.cost("\n".join([*header, note])))
+        budget.reserve(budget.cost(PromptBuilder._scaffold(context)))
 
-        parts.append("## Git Changes (Diff)\n")
-        parts.append("```diff")
-        parts.append(context.diff)
-        parts.append("```\n")
+        files_to_read = [f for f in context.files_changed if f in context.file_contents]
+        marks: dict[str, LineMarks] = {}
+        if options.compact:
+            marks = {
+                f: line_marks(context.file_diffs[f])
+                for f in files_to_read
+                if f in context.file_diffs and context.file_diffs[f].hunks
+            }
 
-        files_to_read = [
-            f for f in context.files_changed if f in context.file_contents
-        ]
-        parts.append(f"## File Content Context ({len(files_to_read)} files)\n")
+        # 1. Diff, file by file. Files marked inline only need one as a fallback.
+        patches = {path: fd.patch for path, fd in context.file_diffs.items()}
+        if not patches:
+            patches = {"": context.diff}
+        diffs: list[str] = []
+        in_diff: set[str] = set()
+        for path, patch in patches.items():
+            if path in marks:
+                continue
+            if PromptBuilder._take_patch(budget, path, patch, diffs, dropped):
+                in_diff.add(path)
+
+        blocks: dict[str, str] = {}
+
+        # 2. Hunk context. In full mode it is only a fallback when a budget applies.
+        if (
+            options.context_mode == ContextMode.Hunks
+            or options.token_budget is not None
+        ):
+            for filepath in files_to_read:
+                excerpt = PromptBuilder._format_excerpt(
+                    context, filepath, options, marks.get(filepath)
+                )
+                if excerpt is None:
+                    if options.context_mode == ContextMode.Full:
+                        continue
+                    # Without hunk data there is nothing to window around.
+                    excerpt = PromptBuilder._format_file_with_lines(
+                        context.file_contents[filepath].content
+                    )
+                block = PromptBuilder._file_block(context, filepath, excerpt)
+                if budget.take(budget.cost(block)):
+                    blocks[filepath] = block
+                    continue
+                dropped.append(f"context:{filepath}")
+                # The bare diff still shows what changed.
+                if marks.pop(filepath, None) and PromptBuilder._take_patch(
+                    budget, filepath, patches[filepath], diffs, dropped
+                ):
+                    in_diff.add(filepath)
+
+        # 3. Linter findings.
+        lint_lines: dict[str, list[str]] = {}
+        omitted_issues = 0
+        for lang, issues in context.linter_results.by_language.items():
+            for issue in issues:
+                line = PromptBuilder._format_issue(issue)
+                if budget.take(budget.cost(line + "\n")):
+                    lint_lines.setdefault(lang, []).append(line)
+                else:
+                    omitted_issues += 1
+        if omitted_issues:
+            dropped.append(f"lint:{omitted_issues} findings")
+
+        # 4. The rest of each file.
+        if options.context_mode == ContextMode.Full:
+            for filepath in files_to_read:
+                info = context.file_contents[filepath]
+                block = PromptBuilder._file_block(
+                    context,
+                    filepath,
+                    PromptBuilder._format_file_with_lines(
+                        info.content, marks.get(filepath)
+                    ),
+                )
+                current = blocks.get(filepath)
+                extra = budget.cost(block) - (budget.cost(current) if current else 0)
+                if budget.take(extra):
+                    blocks[filepath] = block
+                elif current is None:
+                    marks.pop(filepath, None)
+                    dropped.append(f"file:{filepath}")
+                else:
+                    dropped.append(f"rest-of-file:{filepath}")
+
+        # A review of a prompt without the change could approve it unseen.
+        missing = [p for p in patches if p not in in_diff and p not in marks]
+        if missing:
+            raise PromptBudgetError(missing)
+
+        sections = (diffs, files_to_read, blocks, lint_lines, omitted_issues, options)
+        text = PromptBuilder._render(context, header, note, *sections)
+        stable = PromptBuilder._render(context, header, "", *sections) if note else text
+
+        built = BuiltPrompt(
+            text=text,
+            estimated_tokens=estimator.count(text),
+            build_seconds=time.perf_counter() - start,
+            dropped=dropped,
+            saved_tokens=PromptBuilder._inlined_savings(context, marks, estimator),
+            stable_hash=hashlib.sha256(stable.encode("utf-8")).hexdigest(),
+        )
+        logger.debug(
+            f"Prompt built in {built.build_seconds * 1000:.1f} ms, ~{built.estimated_tokens} tokens"
+        )
+        if dropped:
+            logger.warning(
+                f"Prompt exceeded the token budget, dropped: {', '.join(dropped)}"
+            )
+        return built
+
+    @staticmethod
+    def _render(
+        context: ReviewContext,
+        header: list[str],
+        note: str,
+        diffs: list[str],
+        files_to_read: list[str],
+        blocks: dict[str, str],
+        lint_lines: dict[str, list[str]],
+        omitted_issues: int,
+        options: PromptOptions,
+    ) -> str:
+        parts: list[str] = list(header)
+        stable_first = options.layout == PromptLayout.StableFirst
+
+        if note and not stable_first:
+            parts.append(note)
+
+        diff_section = ["## Git Changes (Diff)\n", "```diff", "".join(diffs), "```\n"]
+        if options.compact and not diffs:
+            diff_section = []
+        if not stable_first:
+            parts.extend(diff_section)
 
-        for filepath in files_to_read:
-            info = context.file_contents[filepath]
-            parts.append(f"### File: {filepath} ({info.language})")
+        included = [f for f in files_to_read if f in blocks]
+        if options.context_mode == ContextMode.Hunks:
             parts.append(
-                "```text"
+                f"## File Content Context ({len(included)} files, excerpts around each change)\n"
             )
-            parts.append(PromptBuilder._format_file_with_lines(info.content))
-            parts.append("```\n")
+        elif options.compact:
+            parts.append(
+                f"## File Content Context ({len(included)} files, changes marked inline)\n"
+            )
+        else:
+            parts.append(f"## File Content Context ({len(included)} files)\n")
+
+        for filepath in included:
+            parts.append(blocks[filepath])
+
+        if stable_first:
+            parts.extend(diff_section)
 
         if context.linter_results.issues:
             parts.append("## Linter Results (Automated Checks)\n")
             parts.append(f"Total Issues: {len(context.linter_results.issues)}\n")
 
-            for lang, issues in context.linter_results.by_language.items():
-                 parts.append(f"### {lang} Issues\n")
-                 for issue in issues:
-                     parts.append(f"- [{issue.linter}] {issue.file}: {issue.message}")
+            for lang, lines in lint_lines.items():
+                parts.append(f"### {lang} Issues\n")
+                parts.extend(lines)
+            if omitted_issues:
+                parts.append(
+                    f"- ... {omitted_issues} more issue(s) omitted to fit the context window"
+                )
+            if context.linter_results.outside_changes:
+                parts.append(PromptBuilder._outside_changes_note(context))
             parts.append("\n")
+        elif context.linter_results.outside_changes:
+            parts.append("## Linter Results\n✅ No linter issues on the changed lines.")
+            parts.append(PromptBuilder._outside_changes_note(context) + "\n")
         else:
             parts.append("## Linter Results\n✅ No linter issues found.\n")
 
+        if note and stable_first:
+            parts.append(note)
+
+        return "\n".join(parts)
+
+    @staticmethod
+    def _take_patch(
+        budget: _Budget, path: str, patch: str, diffs: list[str], dropped: list[str]
+    ) -> bool:
+        """
+        Adds the patch, or as many of its leading hunks as fit. False if not even
+        the file header and one hunk fit.
+        """
+        if budget.take(budget.cost(patch)):
+            diffs.append(patch)
+            return True
+
+        head, *hunks = HUNK_START_RE.split(patch)
+        kept: list[str] = []
+        for hunk in hunks:
+            omitted = len(hunks) - len(kept) - 1
+            text = "".join([head, *kept, hunk]) + PromptBuilder._omitted_hunks(omitted)
+            if budget.cost(text) > (budget.remaining or 0):
+                break
+            kept.append(hunk)
+
+        if not kept:
+            return False
+
+        omitted = len(hunks) - len(kept)
+        text = "".join([head, *kept]) + PromptBuilder._omitted_hunks(omitted)
+        budget.take(budget.cost(text))
+        diffs.append(text)
+        dropped.append(f"diff:{path} ({omitted} of {len(hunks)} hunks)")
+        return True
+
+    @staticmethod
+    def _omitted_hunks(count: int) -> str:
+        return (
+            f"... {count} more hunk(s) omitted to fit the context window\n"
+            if count
+            else ""
+        )
+
+    @staticmethod
+    def _inlined_savings(
+        context: ReviewContext, marks: dict[str, LineMarks], estimator: TokenEstimator
+    ) -> int:
+        """Diff tokens not sent for files marked inline, less the removed lines kept."""
+        saved = 0
+        for filepath, file_marks in marks.items():
+            removed = [line for lines in file_marks.removed.values() for line in lines]
+            saved += estimator.count(context.file_diffs[filepath].patch)
+            saved -= estimator.count("\n".join(removed)) if removed else 0
+        return max(saved, 0)
+
+    @staticmethod
+    def _outside_changes_note(context: ReviewContext) -> str:
+        count = context.linter_results.outside_changes
+        return f"({count} pre-existing issue(s) outside the changed lines were omitted)"
+
+    @staticmethod
+    def _scaffold(context: ReviewContext) -> str:
+        """Fixed headings that are emitted regardless of what fits in the budget."""
+        parts = [
+            "## Git Changes (Diff)\n",
+            "```diff",
+            "```\n",
+            "## File Content Context (000 files, excerpts around each change)\n",
+            "## Linter Results (Automated Checks)\n",
+            "Total Issues: 0000\n",
+            "- ... 0000 more issue(s) omitted to fit the context window",
+            "(0000 pre-existing issue(s) outside the changed lines were omitted)",
+        ]
+        parts.extend(
+            f"### {lang} Issues\n" for lang in context.linter_results.by_language
+        )
         return "\n".join(parts)
 
     @staticmethod
-    def _format_file_with_lines(content: str) -> str:
+    def _file_block(context: ReviewContext, filepath: str, body: str) -> str:
+        info = context.file_contents[filepath]
+        return "\n".join(
+            [
+                f"### File: {filepath} ({PromptBuilder._describe_file(context, filepath, info.language)})",
+                "```text",
+                body,
+                "```\n",
+            ]
+        )
+
+    @staticmethod
+    def _format_issue(issue: LintScoreIssue) -> str:
+        location = issue.file
+        if issue.line is not None:
+            location += f":{issue.line}"
+            if issue.column is not None:
+                location += f":{issue.column}"
+        return f"- [{issue.linter}] {location}: {issue.message}"
+
+    @staticmethod
+    def _describe_file(context: ReviewContext, filepath: str, language: str) -> str:
+        file_diff = context.file_diffs.get(filepath)
+        if not file_diff:
+            return language
+
+        details = [language, f"+{file_diff.additions}/-{file_diff.deletions}"]
+        if file_diff.is_new:
+            details.append("new file")
+        if file_diff.is_rename:
+            details.append(f"renamed from {file_diff.old_path}")
+        return ", ".join(details)
+
+    @staticmethod
+    def _format_excerpt(
+        context: ReviewContext,
+        filepath: str,
+        options: PromptOptions,
+        marks: LineMarks | None = None,
+    ) -> str | None:
+        file_diff = context.file_diffs.get(filepath)
+        if not file_diff:
+            return None
+
+        info: FileContext = context.file_contents[filepath]
+        ranges = context_ranges(info, file_diff, options.context_window)
+        if not ranges:
+            return "(no content changes)"
+        return PromptBuilder._format_ranges_with_lines(info.content, ranges, marks)
+
+    @staticmethod
+    def _format_file_with_lines(content: str, marks: LineMarks | None = None) -> str:
         lines = content.splitlines()
+        if marks is not None:
+            return PromptBuilder._format_ranges_with_lines(
+                content, [(1, len(lines))], marks
+            )
         digits = len(str(len(lines)))
         formatted = []
         for i, line in enumerate(lines, 1):
             formatted.append(f"{i:>{digits}} | {line}")
         return "\n".join(formatted)
+
+    @staticmethod
+    def _format_ranges_with_lines(
+        content: str, ranges: list[LineRange], marks: LineMarks | None = None
+    ) -> str:
+        lines = content.splitlines()
+        digits = len(str(len(lines)))
+        formatted = []
+        for start, end in ranges:
+            if formatted or start > 1:
+                formatted.append(f"{'...':>{digits}}")
+            last = min(end, len(lines))
+            for i in range(start, last + 1):
+                if marks is None:
+                    formatted.append(f"{i:>{digits}} | {lines[i - 1]}")
+                    continue
+                formatted.extend(PromptBuilder._removed_lines(marks, i, digits))
+                mark = "+" if i in marks.added else " "
+                formatted.append(f"{i:>{digits}}{mark}| {lines[i - 1]}")
+            if marks is not None:
+                # Lines removed right after the range, e.g. at the end of the file.
+                formatted.extend(PromptBuilder._removed_lines(marks, last + 1, digits))
+        if ranges and ranges[-1][1] < len(lines):
+            formatted.append(f"{'...':>{digits}}")
+        return "\n".join(formatted)
+
+    @staticmethod
+    def _removed_lines(marks: LineMarks, before: int, digits: int) -> list[str]:
+        return [f"{'':>{digits}}-| {line}" for line in marks.removed.get(before, [])]
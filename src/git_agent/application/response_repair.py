@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from git_agent.domain.models import (
+    ApprovalStatus,
+    CodeIssue,
+    CodeReviewResult,
+    CommitMessage,
+    CommitType,
+    SeverityLevel,
+    StyleCategory,
+    StyleSuggestion,
+)
+from git_agent.domain.prompts import SENIOR_DEV_PROMPT
+
+# Cutting a truncated response back to an earlier comma is tried this many times.
+MAX_CUTS = 64
+
+# A `\uXXXX` escape missing some of its digits at the end of a truncated string.
+PARTIAL_UNICODE_ESCAPE_RE = re.compile(r"(?<!\\)((?:\\\\)*)\\u[0-9a-fA-F]{0,3}$")
+
+# Fields a review cannot be shown without. Anything else has a usable default.
+ESSENTIAL_FIELDS = ("summary", "approval_status")
+
+# Output budget of the follow-up request for missing fields.
+MISSING_FIELDS_MAX_TOKENS = 512
+
+SEVERITY_ALIASES = {
+    "error": SeverityLevel.Critical,
+    "high": SeverityLevel.Critical,
+    "major": SeverityLevel.Critical,
+    "blocker": SeverityLevel.Critical,
+    "medium": SeverityLevel.Warning,
+    "warn": SeverityLevel.Warning,
+    "low": SeverityLevel.Info,
+    "minor": SeverityLevel.Info,
+    "note": SeverityLevel.Info,
+    "suggestion": SeverityLevel.Info,
+}
+
+STATUS_ALIASES = {
+    "approve": ApprovalStatus.Approved,
+    "accepted": ApprovalStatus.Approved,
+    "lgtm": ApprovalStatus.Approved,
+    "needs_changes": ApprovalStatus.NeedsFixes,
+    "changes_requested": ApprovalStatus.NeedsFixes,
+    "request_changes": ApprovalStatus.NeedsFixes,
+    "reject": ApprovalStatus.Rejected,
+    "blocked": ApprovalStatus.Rejected,
+}
+
+COMMIT_TYPE_ALIASES = {
+    "feature": CommitType.Feat,
+    "bugfix": CommitType.Fix,
+    "hotfix": CommitType.Fix,
+    "doc": CommitType.Docs,
+    "tests": CommitType.Test,
+    "performance": CommitType.Perf,
+    "build": CommitType.Chore,
+    "ci": CommitType.Chore,
+}
+
+# The list an issue sits in says more about its severity than an unknown label.
+ISSUE_LISTS = {
+    "critical_bugs": SeverityLevel.Critical,
+    "warnings": SeverityLevel.Warning,
+}
+
+
+@dataclass
+class RepairedReview:
+    """What could be salvaged from a malformed review, and what is still missing."""
+
+    data: dict[str, Any]
+    missing: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+
+    def complete(self, fields: dict[str, Any]) -> None:
+        """Merges fields returned by a follow-up request."""
+        for name in list(self.missing):
+            value = _coerce_field(name, fields.get(name), self.dropped)
+            if value is not None:
+                self.data[name] = value
+                self.missing.remove(name)
+
+    def to_result(self) -> CodeReviewResult:
+        if self.missing:
+            raise ValueError(f"Review is missing {', '.join(self.missing)}")
+        if self.dropped:
+            logger.warning(f"Repaired review, dropped: {', '.join(self.dropped)}")
+        return CodeReviewResult.model_validate(self.data)
+
+
+def repair_review(raw: str) -> RepairedReview:
+    """
+    Salvages a review from truncated or slightly invalid JSON: closes what was cut off,
+    coerces near-miss enum values and keeps every sub-object that validates on its own.
+    Raises ValueError when no JSON object can be recovered.
+    """
+    text = close_truncated_json(raw)
+    if text is None:
+        raise ValueError("Model did not return a JSON object")
+
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Model did not return a JSON object")
+
+    repaired = RepairedReview(data={})
+    for name in CodeReviewResult.model_fields:
+        value = _coerce_field(name, data.get(name), repaired.dropped)
+        if value is not None:
+            repaired.data[name] = value
+
+    # The prompt requires rejecting a change with critical bugs.
+    if "approval_status" not in repaired.data and repaired.data.get("critical_bugs"):
+        repaired.data["approval_status"] = ApprovalStatus.Rejected
+
+    repaired.data.setdefault("commit_proposals", [])
+    repaired.data.setdefault("files_reviewed", 0)
+    repaired.data.setdefault("languages_detected", [])
+    repaired.missing = [f for f in ESSENTIAL_FIELDS if f not in repaired.data]
+    return repaired
+
+
+def missing_fields_schema(missing: list[str]) -> dict[str, Any]:
+    """JSON schema asking for just the missing fields of a review."""
+    schema = CodeReviewResult.model_json_schema()
+    subset: dict[str, Any] = {
+        "type": "object",
+        "properties": {name: schema["properties"][name] for name in missing},
+        "required": list(missing),
+    }
+    if "$defs" in schema:
+        subset["$defs"] = schema["$defs"]
+    return subset
+
+
+def missing_fields_messages(
+    prompt: str, raw: str, missing: list[str], system: str = SENIOR_DEV_PROMPT
+) -> list[dict[str, str]]:
+    """
+    A chat that replays the review request and the broken answer, so Ollama reuses
+    both from its KV cache, then asks for just the missing fields.
+    """
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+        {"role": "assistant", "content": raw},
+        {
+            "role": "user",
+            "content": "Your review JSON was incomplete. Reply with a JSON object "
+            f"containing only these fields: {', '.join(missing)}.",
+        },
+    ]
+
+
+def parse_fields(raw: str) -> dict[str, Any]:
+    """The fields of a follow-up answer; empty if it is not a JSON object either."""
+    text = close_truncated_json(raw)
+    data = json.loads(text) if text else {}
+    return data if isinstance(data, dict) else {}
+
+
+def close_truncated_json(raw: str) -> str | None:
+    """
+    Returns the first JSON object in `raw` as valid JSON: trailing commas removed and,
+    if the text was cut off, open strings and containers closed after the last
+    complete value. None if nothing parses.
+    """
+    start = raw.find("{")
+    if start < 0:
+        return None
+
+    out: list[str] = []
+    stack: list[str] = []
+    # Positions in `out` of commas between values, with the containers open there.
+    cuts: list[tuple[int, tuple[str, ...]]] = []
+    in_string = escaped = False
+
+    for ch in raw[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch in "}]":
+            _drop_trailing_comma(out)
+            out.append(ch)
+            if stack:
+                stack.pop()
+            if not stack:
+                return "".join(out)
+            continue
+
+        out.append(ch)
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch == ",":
+            cuts.append((len(out) - 1, tuple(stack)))
+
+    text = "".join(out)
+    tail = text
+    if in_string:
+        # An escape sequence cut off midway cannot be closed; drop it before the quote.
+        tail = tail[:-1] if escaped else PARTIAL_UNICODE_ESCAPE_RE.sub(r"\1", tail)
+        tail += '"'
+    candidates = [(tail, tuple(stack))]
+    candidates += [(text[:index], open_) for index, open_ in reversed(cuts[-MAX_CUTS:])]
+
+    for body, open_ in candidates:
+        closed = body.rstrip().rstrip(",") + "".join(
+            "}" if c == "{" else "]" for c in reversed(open_)
+        )
+        try:
+            json.loads(closed)
+        except ValueError:
+            continue
+        return closed
+    return None
+
+
+def _drop_trailing_comma(out: list[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index]
+
+
+def _coerce_field(name: str, value: Any, dropped: list[str]) -> Any:
+    if value is None:
+        return None
+
+    if name in ISSUE_LISTS:
+        return _valid_items(
+            CodeIssue, value, name, dropped, lambda item: _coerce_issue(item, name)
+        )
+    if name == "style_suggestions":
+        return _valid_items(StyleSuggestion, value, name, dropped, _coerce_style)
+    if name == "commit_proposals":
+        return _valid_items(CommitMessage, value, name, dropped, _coerce_commit)
+    if name == "approval_status":
+        status = _coerce_enum(ApprovalStatus, value, STATUS_ALIASES)
+        if status is None:
+            dropped.append(f"approval_status:{value}")
+        return status
+    if name == "confidence":
+        try:
+            confidence = float(value)
+        except TypeError, ValueError:
+            return None
+        # Some models answer in percent.
+        return confidence / 100 if 1 < confidence <= 100 else confidence
+    if name == "files_reviewed":
+        return value if isinstance(value, int) else None
+    if name == "languages_detected":
+        return [str(v) for v in value] if isinstance(value, list) else None
+    return value if isinstance(value, str) else None
+
+
+def _valid_items(
+    model: type[BaseModel],
+    value: Any,
+    name: str,
+    dropped: list[str],
+    coerce: Callable[[dict], dict],
+) -> list:
+    if isinstance(value, dict):
+        value = [value]
+    if not isinstance(value, list):
+        dropped.append(name)
+        return []
+
+    items = []
+    for index, item in enumerate(value):
+        if not isinstance(item, dict):
+            dropped.append(f"{name}[{index}]")
+            continue
+        try:
+            items.append(model.model_validate(coerce(dict(item))))
+        except ValidationError:
+            dropped.append(f"{name}[{index}]")
+    return items
+
+
+def _coerce_issue(item: dict, list_name: str) -> dict:
+    severity = _coerce_enum(SeverityLevel, item.get("severity"), SEVERITY_ALIASES)
+    item["severity"] = severity or ISSUE_LISTS[list_name]
+    item.setdefault("suggestion", "")
+    if isinstance(item.get("line"), str):
+        digits = item["line"].strip().split("-")[0]
+        item["line"] = int(digits) if digits.isdigit() else 0
+    item.setdefault("line", 0)
+    return item
+
+
+def _coerce_style(item: dict) -> dict:
+    category = _coerce_enum(StyleCategory, item.get("category"), {})
+    if category is not None:
+        item["category"] = category
+    return item
+
+
+def _coerce_commit(item: dict) -> dict:
+    commit_type = _coerce_enum(CommitType, item.get("type"), COMMIT_TYPE_ALIASES)
+    if commit_type is not None:
+        item["type"] = commit_type
+    item.setdefault("scope", "")
+    return item
+
+
+def _coerce_enum[E](enum: type[E], value: Any, aliases: dict[str, E]) -> E | None:
+    if not isinstance(value, str):
+        return None
+    key = value.strip().lower().replace(" ", "_").replace("-", "_")
+    try:
+        return enum(key)
+    except ValueError:
+        return aliases.get(key)
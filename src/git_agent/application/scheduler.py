@@ -0,0 +1,59 @@
+from loguru import logger
+
+from git_agent.infra.endpoint_pool import model_key
+
+GIB = 1024**3
+
+# A loaded model needs more than its weights: KV cache and runtime buffers.
+LOAD_OVERHEAD = 1.2
+
+
+def plan_waves(
+    models: list[str],
+    sizes: dict[str, int],
+    loaded: dict[str, int],
+    memory_budget: int | None = None,
+) -> list[list[str]]:
+    """
+    Orders models so the ones Ollama already holds run first. With a memory budget,
+    packs the rest into waves that fit it (first-fit decreasing), so every model is
+    loaded at most once. A model of unknown size gets a wave of its own.
+    """
+    warm = [m for m in models if model_key(m) in loaded]
+    cold = [m for m in models if model_key(m) not in loaded]
+
+    def footprint(model: str) -> int:
+        key = model_key(model)
+        if key in loaded:
+            return loaded[key]
+        if sizes.get(key):
+            return int(sizes[key] * LOAD_OVERHEAD)
+        return memory_budget or 0
+
+    if memory_budget is None:
+        return [warm + cold]
+
+    cold.sort(key=footprint, reverse=True)
+
+    waves: list[list[str]] = []
+    used: list[int] = []
+
+    for model in warm + cold:
+        cost = footprint(model)
+        for index, wave_used in enumerate(used):
+            if wave_used + cost <= memory_budget:
+                waves[index].append(model)
+                used[index] += cost
+                break
+        else:
+            waves.append([model])
+            used.append(cost)
+
+    if len(waves) > 1:
+        logger.info(
+            f"Running {len(models)} models in {len(waves)} waves to fit "
+            f"{memory_budget / GIB:.1f} GiB: "
+            + " | ".join(", ".join(wave) for wave in waves)
+        )
+
+    return waves
@@ -1,7 +1,13 @@
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
 from loguru import logger
 
-from git_agent.domain.models import FileContext, ReviewContext
+from git_agent.application.lint_filter import restrict_to_changes
+from git_agent.domain.models import FileContext, LintScore, ReviewContext
 from git_agent.domain.ports import FSProvider, GitProvider, LinterProvider
+from git_agent.domain.result import Result
 
 
 class ReviewService:
@@ -10,17 +16,28 @@ class ReviewService:
         git_provider: GitProvider,
         fs_provider: FSProvider,
         linter_provider: LinterProvider,
+        lint_margin: int | None = 3,
+        max_workers: int = 4,
     ):
         self.git_provider = git_provider
         self.fs_provider = fs_provider
         self.linter_provider = linter_provider
+        # Lines around each hunk whose findings are kept; None keeps every finding.
+        self.lint_margin = lint_margin
+        self.max_workers = max_workers
 
     def gather_context(self) -> ReviewContext:
+        """
+        Runs the git diff first, then file reads and linters concurrently, since both
+        only depend on the list of changed files.
+        """
         logger.debug("Gathering context...")
+        started = time.perf_counter()
+        timings: dict[str, float] = {}
         file_contents: dict[str, FileContext] = {}
 
         logger.debug("  Getting git diff...")
-        diff_result = self.git_provider.get_diff()
+        diff_result = _timed(timings, "diff", self.git_provider.get_diff)
 
         if not diff_result.success:
             raise ValueError(f"Cannot obtain git diff: {diff_result.message}")
@@ -28,16 +45,30 @@ class ReviewService:
         if not diff_result.value:
             raise ValueError("Git diff result is empty")
 
-        files_changed = diff_result.value.files_changed
+        git_diff = diff_result.value
+        files_changed = git_diff.files_changed
         files_changed_count = len(files_changed)
 
         logger.debug(f"{files_changed_count} modified file(s)")
 
-        logger.debug("  Reading files content")
+        # Deleted and binary files have no readable or lintable content.
+        readable_files = [
+            f.path for f in git_diff.files if not (f.is_deleted or f.is_binary)
+        ]
+
+        logger.debug("  Reading files content and running linters...")
 
-        for r_file_path in files_changed:
-            file_content = self.fs_provider.read_file(r_file_path)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            read_future = executor.submit(
+                _timed, timings, "read", self.fs_provider.read_files, readable_files
+            )
+            lint_future = executor.submit(
+                _timed, timings, "lint", self.linter_provider.run_linter, readable_files
+            )
+            read_results = read_future.result()
+            linter_result: Result[LintScore] = lint_future.result()
 
+        for r_file_path, file_content in read_results.items():
             if not file_content.success:
                 logger.warning(f"Could not read {r_file_path}: {file_content.message}")
                 continue
@@ -48,21 +79,47 @@ class ReviewService:
             file_contents[r_file_path] = file_content.value
             logger.debug(f"  Read {r_file_path}")
 
-        logger.debug("  Running linters...")
-
-        linter_result = self.linter_provider.run_linter(files_changed)
-
         if not linter_result.success:
             raise ValueError(f"Linter failed: {linter_result.message}")
 
         if not linter_result.value:
             raise ValueError("Linter result is empty")
 
+        lint_score = linter_result.value
+        file_diffs = git_diff.by_path()
+
+        if self.lint_margin is not None:
+            lint_score = restrict_to_changes(lint_score, file_diffs, self.lint_margin)
+            logger.debug(
+                f"  {len(lint_score.issues)} linter finding(s) on changed lines, "
+                f"{lint_score.outside_changes} elsewhere"
+            )
+
+        timings["total"] = time.perf_counter() - started
+        logger.debug(
+            "  Context timings: "
+            + ", ".join(
+                f"{stage}={secs * 1000:.0f}ms" for stage, secs in timings.items()
+            )
+        )
+
         context = ReviewContext(
-            diff=diff_result.value.diff,
+            diff=git_diff.diff,
             files_changed=files_changed,
             file_contents=file_contents,
-            linter_results=linter_result.value,
+            linter_results=lint_score,
+            file_diffs=file_diffs,
+            timings=timings,
         )
 
         return context
+
+
+def _timed[T](
+    timings: dict[str, float], stage: str, fn: Callable[..., T], *args: object
+) -> T:
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[stage] = time.perf_counter() - start
@@ -0,0 +1,208 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from loguru import logger
+
+from git_agent.application.ollama_agent import (
+    PreparedReview,
+    RequestPreparer,
+    budgeted_options,
+    prepare_review,
+)
+from git_agent.application.prompt_builder import PromptOptions
+from git_agent.domain.models import (
+    ApprovalStatus,
+    CodeIssue,
+    CodeReviewResult,
+    CommitMessage,
+    LintScore,
+    LintScoreIssue,
+    ReviewContext,
+)
+from git_agent.domain.ports import TokenEstimator
+from git_agent.infra.ollama_llm_provider import prepare
+
+STATUS_RANK = {
+    ApprovalStatus.Approved: 0,
+    ApprovalStatus.NeedsFixes: 1,
+    ApprovalStatus.Rejected: 2,
+}
+
+# Share of the budget a shard may fill; the rest absorbs headings and estimate error.
+SHARD_FILL_RATIO = 0.8
+
+
+@dataclass
+class ReviewShard:
+    context: ReviewContext
+    estimated_tokens: int
+
+
+@dataclass(frozen=True)
+class PreparedShard:
+    context: ReviewContext
+    review: PreparedReview
+
+
+def shard_context(
+    context: ReviewContext, token_budget: int, estimator: TokenEstimator
+) -> list[ReviewShard]:
+    """Splits the changeset into groups of files whose content fits the token budget."""
+    limit = int(token_budget * SHARD_FILL_RATIO)
+    groups: list[tuple[list[str], int]] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    lint_costs: dict[str, int] = {}
+    for issue in context.linter_results.issues:
+        lint_costs[issue.file] = lint_costs.get(issue.file, 0) + estimator.count(
+            issue.message
+        )
+
+    for path in context.files_changed:
+        cost = _file_cost(context, path, estimator) + lint_costs.get(path, 0)
+        if current and current_tokens + cost > limit:
+            groups.append((current, current_tokens))
+            current, current_tokens = [], 0
+        current.append(path)
+        current_tokens += cost
+
+    if current:
+        groups.append((current, current_tokens))
+
+    return [
+        ReviewShard(_sub_context(context, paths), tokens) for paths, tokens in groups
+    ]
+
+
+def merge_reviews(results: list[CodeReviewResult]) -> CodeReviewResult:
+    """Reduces shard reviews into one: de-duplicated issues and the worst approval status."""
+    if len(results) == 1:
+        return results[0]
+
+    notes = [r.additional_notes for r in results if r.additional_notes]
+    confidences = [r.confidence for r in results if r.confidence is not None]
+
+    return CodeReviewResult(
+        summary="\n\n".join(r.summary for r in results if r.summary),
+        critical_bugs=_unique_issues(i for r in results for i in r.critical_bugs),
+        warnings=_unique_issues(i for r in results for i in r.warnings),
+        style_suggestions=list(
+            {
+                (s.category, s.file, s.line, s.description): s
+                for r in results
+                for s in r.style_suggestions
+            }.values()
+        ),
+        commit_proposals=_combine_commits(
+            c for r in results for c in r.commit_proposals
+        ),
+        approval_status=max(
+            (r.approval_status for r in results), key=lambda s: STATUS_RANK[s]
+        ),
+        confidence=min(confidences) if confidences else None,
+        files_reviewed=sum(r.files_reviewed for r in results),
+        languages_detected=sorted(
+            {lang for r in results for lang in r.languages_detected}
+        ),
+        additional_notes="\n\n".join(notes) if notes else None,
+    )
+
+
+def prepare_shards(
+    context: ReviewContext,
+    user_context: str,
+    options: PromptOptions,
+    estimator: TokenEstimator,
+    num_ctx: int,
+    stream: bool = False,
+    preparer: RequestPreparer = prepare,
+) -> list[PreparedShard]:
+    """Shards the context and builds every shard's request once, ready to share across models."""
+    budget = budgeted_options(options, num_ctx, estimator).token_budget or 0
+    shards = shard_context(context, budget, estimator)
+
+    if len(shards) > 1:
+        logger.info(
+            f"Splitting {len(context.files_changed)} files into {len(shards)} shards"
+        )
+
+    return [
+        PreparedShard(
+            s.context,
+            prepare_review(
+                s.context, user_context, options, estimator, num_ctx, stream, preparer
+            ),
+        )
+        for s in shards
+    ]
+
+
+def _file_cost(context: ReviewContext, path: str, estimator: TokenEstimator) -> int:
+    cost = 0
+    file_diff = context.file_diffs.get(path)
+    if file_diff:
+        cost += estimator.count(file_diff.patch)
+    info = context.file_contents.get(path)
+    if info:
+        # Account for the "NNN | " prefix added to every numbered line.
+        cost += estimator.count(info.content) + estimator.count(
+            " " * 6 * info.line_count
+        )
+    return cost
+
+
+def _sub_context(context: ReviewContext, paths: list[str]) -> ReviewContext:
+    selected = set(paths)
+    issues = [i for i in context.linter_results.issues if i.file in selected]
+    by_language: dict[str, list[LintScoreIssue]] = {}
+    for issue in issues:
+        by_language.setdefault(issue.language, []).append(issue)
+
+    outside_by_file = {
+        p: n for p, n in context.linter_results.outside_by_file.items() if p in selected
+    }
+
+    file_diffs = {p: context.file_diffs[p] for p in paths if p in context.file_diffs}
+    diff = (
+        "".join(fd.patch for fd in file_diffs.values()) if file_diffs else context.diff
+    )
+
+    return ReviewContext(
+        diff=diff,
+        files_changed=list(paths),
+        file_contents={
+            p: context.file_contents[p] for p in paths if p in context.file_contents
+        },
+        linter_results=LintScore(
+            issues=issues,
+            by_language=by_language,
+            linters_used={i.linter for i in issues},
+            outside_changes=sum(outside_by_file.values()),
+            outside_by_file=outside_by_file,
+        ),
+        file_diffs=file_diffs,
+        timings=context.timings,
+    )
+
+
+def _unique_issues(issues: Iterable[CodeIssue]) -> list[CodeIssue]:
+    unique: dict[tuple[str, int, str], CodeIssue] = {}
+    for issue in issues:
+        key = (issue.file, issue.line, issue.description.strip().lower())
+        unique.setdefault(key, issue)
+    return list(unique.values())
+
+
+def _combine_commits(commits: Iterable[CommitMessage]) -> list[CommitMessage]:
+    combined: dict[str, CommitMessage] = {}
+    for commit in commits:
+        key = commit.format()
+        if key in combined:
+            existing = combined[key]
+            combined[key] = existing.model_copy(
+                update={"files": list(dict.fromkeys([*existing.files, *commit.files]))}
+            )
+        else:
+            combined[key] = commit
+    return list(combined.values())
@@ -0,0 +1,60 @@
+import math
+
+from git_agent.domain.ports import TokenEstimator
+
+
+class CharRatioEstimator(TokenEstimator):
+    """Cheap estimate based on the average characters per token of a tokenizer family."""
+
+    def __init__(self, chars_per_token: float):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+# Measured on source code; lower ratios are more conservative.
+DEFAULT_ESTIMATOR = CharRatioEstimator(3.0)
+
+_estimators: dict[str, TokenEstimator] = {
+    "qwen": CharRatioEstimator(3.2),
+    "llama": CharRatioEstimator(3.5),
+    "mistral": CharRatioEstimator(3.0),
+    "deepseek": CharRatioEstimator(3.2),
+    "gemma": CharRatioEstimator(3.4),
+    "phi": CharRatioEstimator(3.0),
+}
+
+
+class MaxEstimator(TokenEstimator):
+    """Takes the largest estimate, so one prompt fits every model it is shared with."""
+
+    def __init__(self, estimators: list[TokenEstimator]):
+        self.estimators = estimators
+
+    def count(self, text: str) -> int:
+        return max(e.count(text) for e in self.estimators)
+
+
+def register_estimator(model_prefix: str, estimator: TokenEstimator) -> None:
+    _estimators[model_prefix.lower()] = estimator
+
+
+def estimator_for(model: str) -> TokenEstimator:
+    name = model.lower()
+    matches = [prefix for prefix in _estimators if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_ESTIMATOR
+    return _estimators[max(matches, key=len)]
+
+
+def estimator_for_models(models: list[str]) -> TokenEstimator:
+    estimators = list({id(e): e for e in map(estimator_for, models)}.values())
+    return estimators[0] if len(estimators) == 1 else MaxEstimator(estimators)
+
+
+def prompt_token_budget(
+    num_ctx: int, num_predict: int, system: str, estimator: TokenEstimator
+) -> int:
+    """Tokens left for the user prompt once the system prompt and the answer are reserved."""
+    return max(0, num_ctx - num_predict - estimator.count(system))
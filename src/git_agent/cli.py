@@ -2,50 +2,268 @@
 # uv run main.py --models qwen3:8b,mistral-nemo:12b,qwen2.5-coder:7b
 from __future__ import annotations
 
+import asyncio
 import sys
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from loguru import logger
 from rich.progress import (
     BarColumn,
     Progress,
     SpinnerColumn,
+    TaskID,
     TextColumn,
     TimeElapsedColumn,
 )
 
-from git_agent.application.ollama_agent import OllamaCodeReviewAgent
+from git_agent.application.cascade import CascadePolicy, CascadeResult, ReviewCascade
+from git_agent.application.followup import DEFAULT_KEEP_ALIVE, FollowUpSession
+from git_agent.application.ollama_agent import (
+    AsyncCodeReviewAgent,
+    AsyncOllamaCodeReviewAgent,
+    prepare_review,
+)
+from git_agent.application.orchestrator import (
+    ModelRunResult,
+    ReviewOrchestrator,
+    RunStatus,
+    quorum_verdict,
+)
+from git_agent.application.prompt_builder import (
+    ContextMode,
+    PromptBudgetError,
+    PromptLayout,
+    PromptOptions,
+)
+from git_agent.application.scheduler import GIB, plan_waves
 from git_agent.application.services import ReviewService
-from git_agent.config import parse_args, setup_logger
+from git_agent.application.sharding import PreparedShard, prepare_shards
+from git_agent.application.tokens import estimator_for_models
+from git_agent.config import Config, parse_args, setup_logger
 from git_agent.domain.models import CodeReviewResult, ReviewContext
+from git_agent.infra.endpoint_pool import EndpointPool, LLMResponseError
 from git_agent.infra.fs import FSAdapter
 from git_agent.infra.git import GitAdapter
+from git_agent.infra.git_index import GitIndexAdapter
+from git_agent.infra.lint_cache import LintCache
 from git_agent.infra.linter import LinterAdapter
+from git_agent.infra.llm_cache import LLMResponseCache
+from git_agent.infra.ollama_llm_provider import AsyncOllamaLLMProvider, prepare
+from git_agent.infra.openai_llm_provider import (
+    AsyncOpenAILLMProvider,
+    auth_headers,
+    inspect_openai,
+)
+from git_agent.infra.prompt_eval_store import PromptEvalBaselines
 from git_agent.ui.reporter import TerminalReporter
 
 reporter = TerminalReporter()
 
+STATUS_LABELS = {
+    RunStatus.Queued: "Waiting for a slot...",
+    RunStatus.Thinking: "Thinking...",
+    RunStatus.Done: "Done",
+    RunStatus.Failed: "Failed",
+    RunStatus.Cancelled: "Cancelled",
+}
+
+
+def _prepare_requests(
+    ctx: ReviewContext, uctx: str, prompt_options: PromptOptions, config: Config
+) -> list[PreparedShard]:
+    """Builds the prompt(s) once; every model reuses the same encoded request bodies."""
+    estimator = estimator_for_models(config.models)
+
+    preparer = AsyncOpenAILLMProvider.prepare if config.backend == "openai" else prepare
+
+    args = (uctx, prompt_options, estimator, config.num_ctx, config.stream, preparer)
+    if config.shard:
+        shards = prepare_shards(ctx, *args)
+    else:
+        try:
+            shards = [PreparedShard(ctx, prepare_review(ctx, *args))]
+        except PromptBudgetError as e:
+            logger.warning(f"{e}, splitting the review into shards")
+            shards = prepare_shards(ctx, *args)
+
+    logger.debug(
+        f"Prompt ~{sum(s.review.estimated_tokens for s in shards)} tokens, built in "
+        f"{sum(s.review.build_seconds for s in shards) * 1000:.1f} ms"
+    )
+    if prompt_options.compact:
+        saved = sum(s.review.saved_tokens for s in shards)
+        sent = sum(s.review.request.estimated_tokens for s in shards)
+        logger.info(
+            f"Compact prompt: ~{sent} tokens per model, ~{saved} saved "
+            f"({saved / max(sent + saved, 1):.0%})"
+        )
+    return shards
+
+
+@asynccontextmanager
+async def _open_orchestrator(
+    config: Config, progress: Progress, model_tasks: dict[str, TaskID]
+) -> AsyncIterator[tuple[ReviewOrchestrator, EndpointPool]]:
+    def on_progress(model: str, status: RunStatus) -> None:
+        description = f"[{model}] {STATUS_LABELS[status]}"
+        if status in (RunStatus.Queued, RunStatus.Thinking):
+            progress.update(model_tasks[model], description=description)
+        else:
+            progress.update(
+                model_tasks[model], description=description, completed=1, total=1
+            )
+
+    llm_cache = LLMResponseCache() if config.llm_cache else None
+    baselines = PromptEvalBaselines()
+
+    openai = config.backend == "openai"
 
-@dataclass
-class ModelRunResult:
-    model: str
-    review: CodeReviewResult
-    duration_seconds: float
+    # Keep-alive connections to every host, shared by all models.
+    pool = EndpointPool.connect(
+        config.ollama_hosts,
+        read_timeout=config.read_timeout,
+        pool_size=config.max_concurrency,
+        inspect=inspect_openai if openai else None,
+        headers=auth_headers() if openai else None,
+    )
+    try:
+        await pool.refresh()
+        healthy = pool.healthy_hosts()
+        for host in (e.host for e in pool.endpoints):
+            if host not in healthy:
+                logger.warning(f"{config.backend} server is not reachable at {host}")
+
+        def create_agent(model: str) -> AsyncCodeReviewAgent:
+            if openai:
+                provider = AsyncOpenAILLMProvider(
+                    model=model,
+                    cache=llm_cache,
+                    pool=pool,
+                    batch_prompts=config.batch_prompts,
+                )
+                return AsyncCodeReviewAgent(model, provider)
+            return AsyncOllamaCodeReviewAgent(
+                model,
+                num_ctx=config.num_ctx,
+                cache=llm_cache,
+                pool=pool,
+                keep_alive=config.keep_alive,
+                baselines=baselines,
+            )
 
+        orchestrator = ReviewOrchestrator(
+            create_agent,
+            max_per_endpoint=config.max_concurrency,
+            max_shards_per_model=config.shard_workers,
+            on_progress=on_progress,
+            on_issue=reporter.render_streamed_issue if config.stream else None,
+            quorum=config.quorum,
+        )
+        yield orchestrator, pool
+    finally:
+        await pool.aclose()
+        if llm_cache:
+            llm_cache.close()
 
-def _run_model_review(
-    model: str, ctx: ReviewContext, uctx: str, service: ReviewService
-) -> ModelRunResult:
-    start = time.perf_counter()
 
-    agent = OllamaCodeReviewAgent(model=model)
-    # agent = StrandsCodeReviewAgent(model=model)
-    review = agent.review_with_context(ctx, uctx)
+async def _run_reviews(
+    models: list[str],
+    shards: list[PreparedShard],
+    config: Config,
+    progress: Progress,
+    model_tasks: dict[str, TaskID],
+) -> list[ModelRunResult | None]:
+    async with _open_orchestrator(config, progress, model_tasks) as (
+        orchestrator,
+        pool,
+    ):
+        budget = int(config.memory_budget * GIB) if config.memory_budget else None
+        waves = plan_waves(
+            models, pool.installed_models(), pool.loaded_models(), budget
+        )
+        return await orchestrator.run(models, shards, waves)
 
-    duration = time.perf_counter() - start
-    return ModelRunResult(model=model, review=review, duration_seconds=duration)
+
+async def _run_cascade(
+    models: list[str],
+    shards: list[PreparedShard],
+    context: ReviewContext,
+    config: Config,
+    progress: Progress,
+    model_tasks: dict[str, TaskID],
+) -> CascadeResult:
+    async with _open_orchestrator(config, progress, model_tasks) as (
+        orchestrator,
+        pool,
+    ):
+        policy = CascadePolicy(
+            min_confidence=config.cascade_min_confidence,
+            max_changed_lines=config.cascade_max_lines,
+        )
+        cascade = ReviewCascade(orchestrator, policy, pool.installed_models())
+        return await cascade.run(models, shards, context)
+
+
+def _follow_up(
+    result: ModelRunResult, shards: list[PreparedShard], config: Config
+) -> None:
+    model = result.model
+    reporter.console.print(
+        f"Ask {model} about the review. An empty line or Ctrl-D ends the session."
+    )
+
+    # One loop for the whole session, so the connections outlive each question.
+    with asyncio.Runner() as runner:
+        pool = EndpointPool.connect(
+            config.ollama_hosts, read_timeout=config.read_timeout
+        )
+        llm_provider = AsyncOllamaLLMProvider(
+            model=model,
+            num_ctx=config.num_ctx,
+            pool=pool,
+            keep_alive=config.keep_alive or DEFAULT_KEEP_ALIVE,
+        )
+        session = FollowUpSession(
+            llm_provider, model, shards, result.review, result.hosts
+        )
+        try:
+            while True:
+                try:
+                    question = reporter.console.input("[bold]> [/]").strip()
+                except EOFError, KeyboardInterrupt:
+                    break
+                if question.lower() in {"", "exit", "quit"}:
+                    break
+
+                try:
+                    with reporter.console.status("Thinking..."):
+                        answer = runner.run(session.ask(question))
+                except (ConnectionError, LLMResponseError, ValueError) as e:
+                    logger.error(f"Follow-up failed: {e}")
+                    continue
+                reporter.render_answer(model, answer)
+        finally:
+            runner.run(pool.aclose())
+
+
+def _log_prompt_eval(result: ModelRunResult) -> None:
+    stats = result.prompt_eval
+    if not stats or not stats.requests:
+        return
+
+    message = (
+        f"[{result.model}] Prompt eval: {stats.evaluated_tokens} tokens "
+        f"in {stats.eval_seconds:.2f}s"
+    )
+    if not stats.reused_tokens:
+        logger.debug(message)
+        return
+
+    message += f", ~{stats.reused_tokens} reused from Ollama's cache"
+    if stats.seconds_saved is not None:
+        message += f" (~{stats.seconds_saved:.2f}s saved)"
+    logger.info(message)
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -55,12 +273,22 @@ def main(argv: list[str] | None = None) -> int:
 
     setup_logger(verbose=config.verbose, log_file=config.log_file)
 
-    fs_adapter = FSAdapter()
+    prompt_options = PromptOptions(
+        context_mode=ContextMode(config.context_mode),
+        context_window=config.context_window,
+        layout=PromptLayout(config.prompt_layout),
+        compact=config.compact_prompt,
+    )
+
+    fs_adapter = GitIndexAdapter() if config.content_source == "index" else FSAdapter()
     git_adapter = GitAdapter()
-    linter_adapter = LinterAdapter()
+    linter_adapter = LinterAdapter(cache=LintCache() if config.lint_cache else None)
 
     review_service = ReviewService(
-        git_provider=git_adapter, fs_provider=fs_adapter, linter_provider=linter_adapter
+        git_provider=git_adapter,
+        fs_provider=fs_adapter,
+        linter_provider=linter_adapter,
+        lint_margin=3 if config.lint_scope == "changed" else None,
     )
 
     try:
@@ -72,57 +300,44 @@ def main(argv: list[str] | None = None) -> int:
         except Exception as e:
             logger.error(f"Unexpected error gathering context: {e}")
             return 1
+        finally:
+            if isinstance(fs_adapter, GitIndexAdapter):
+                fs_adapter.close()
 
         logger.debug(f"User context {context}")
+        try:
+            shards = _prepare_requests(context, user_context, prompt_options, config)
+        except PromptBudgetError as e:
+            logger.error(f"{e}. Raise --num-ctx or stage fewer changes.")
+            return 1
         logger.info(f"Running review across models: {', '.join(models)}")
-        results_ordered: list[ModelRunResult | None] = [None] * len(models)
 
         with Progress(
             SpinnerColumn(spinner_name="point"),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             TimeElapsedColumn(),
+            console=reporter.console,
             transient=True,
         ) as progress:
-            model_tasks = {}
-
-            for model in models:
-                task_id = progress.add_task(f"[{model}] Starting...", total=None)
-                model_tasks[model] = task_id
-
-            with ThreadPoolExecutor(max_workers=min(4, len(models))) as executor:
-                future_map = {}
-                for idx, model in enumerate(models):
-                    progress.update(
-                        model_tasks[model], description=f"{model} - Thinking..."
-                    )
-                    future = executor.submit(
-                        _run_model_review, model, context, user_context, review_service
-                    )
-                    future_map[future] = (idx, model)
-
-                for future in as_completed(future_map):
-                    idx, model = future_map[future]
-                    try:
-                        res = future.result()
-                        results_ordered[idx] = res
-                        progress.update(
-                            model_tasks[model],
-                            description=f"[{model}] Done",
-                            completed=1,
-                            total=1,
-                        )
-                    except Exception as e:
-                        logger.exception(f"Model '{model}' failed: {e}")
-                        progress.update(
-                            model_tasks[model],
-                            description=f"[{model}] Failed",
-                            completed=1,
-                            total=1,
-                        )
+            model_tasks = {
+                model: progress.add_task(f"[{model}] Starting...", total=None)
+                for model in models
+            }
+            cascade: CascadeResult | None = None
+            if config.cascade:
+                cascade = asyncio.run(
+                    _run_cascade(models, shards, context, config, progress, model_tasks)
+                )
+                results_ordered = [cascade.result]
+            else:
+                results_ordered = asyncio.run(
+                    _run_reviews(models, shards, config, progress, model_tasks)
+                )
 
         worst_exit = 0
         results_by_model: dict[str, CodeReviewResult] = {}
+        runs_by_model: dict[str, ModelRunResult] = {}
         durations_by_model: dict[str, float] = {}
 
         for res in results_ordered:
@@ -130,15 +345,38 @@ def main(argv: list[str] | None = None) -> int:
                 continue
 
             results_by_model[res.model] = res.review
+            runs_by_model[res.model] = res
             durations_by_model[res.model] = res.duration_seconds
+            _log_prompt_eval(res)
 
             if res.review.approval_status.value == "rejected":
                 worst_exit = max(worst_exit, 1)
 
-        if len(models) > 1:
+        if not results_by_model:
+            logger.error("No model produced a review")
+            return 1
+
+        if config.quorum:
+            verdict = quorum_verdict(results_by_model.values(), config.quorum)
+            if verdict is None:
+                logger.warning(f"No {config.quorum} models agreed on a verdict")
+            else:
+                logger.info(f"Quorum reached: {verdict.value}")
+                # Report only the agreeing majority; the others were cut short.
+                results_by_model = {
+                    m: r
+                    for m, r in results_by_model.items()
+                    if r.approval_status == verdict
+                }
+                worst_exit = int(verdict.value == "rejected")
+
+        if cascade:
+            reporter.render_cascade(cascade)
+
+        if len(results_by_model) > 1:
             reporter.render_multi(results_by_model, durations_by_model)
         else:
-            model = models[0]
+            [model] = results_by_model
             reporter.render_model_header(
                 model,
                 duration_s=durations_by_model[model],
@@ -146,6 +384,13 @@ def main(argv: list[str] | None = None) -> int:
             )
             reporter.render_review(results_by_model[model])
 
+        if config.interactive:
+            if config.backend == "ollama":
+                model = next(m for m in models if m in results_by_model)
+                _follow_up(runs_by_model[model], shards, config)
+            else:
+                logger.warning("Follow-up questions need the Ollama backend")
+
         if worst_exit:
             logger.warning("At least one model rejected the review")
             return worst_exit
@@ -1,11 +1,16 @@
 import argparse
+import os
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from urllib.parse import urlsplit
 
 from loguru import logger
 
 default_model = "qwen3:8b"
+default_host = "http://localhost:11434"
+# Port Ollama assumes when OLLAMA_HOST has neither a scheme nor a port.
+default_ollama_port = 11434
 
 
 @dataclass
@@ -14,6 +19,30 @@ class Config:
     log_file: Path | None
     models: list[str]
     context: str
+    content_source: str = "worktree"
+    context_mode: str = "full"
+    context_window: int = 10
+    num_ctx: int = 16_384
+    shard: bool = False
+    shard_workers: int = 2
+    lint_cache: bool = True
+    lint_scope: str = "changed"
+    stream: bool = False
+    ollama_hosts: list[str] = field(default_factory=lambda: [default_host])
+    read_timeout: float = 600.0
+    max_concurrency: int = 8
+    llm_cache: bool = False
+    memory_budget: float | None = None
+    backend: str = "ollama"
+    batch_prompts: bool = False
+    cascade: bool = False
+    cascade_min_confidence: float = 0.7
+    cascade_max_lines: int = 400
+    quorum: int | None = None
+    prompt_layout: str = "user-first"
+    compact_prompt: bool = False
+    keep_alive: str | None = None
+    interactive: bool = False
 
 
 def parse_args(argv: list[str] | None = None) -> Config:
@@ -31,22 +60,242 @@ def parse_args(argv: list[str] | None = None) -> Config:
         "--models", type=str, help="Comma-separated list of model names to compare"
     )
 
+    parser.add_argument(
+        "--content-source",
+        choices=["worktree", "index"],
+        default="worktree",
+        help="Where to read changed file content from: working tree or staged index",
+    )
+
+    parser.add_argument(
+        "--context-mode",
+        choices=["full", "hunks"],
+        default="full",
+        help="Send whole files or only a window around each change",
+    )
+    parser.add_argument(
+        "--context-window",
+        type=int,
+        default=10,
+        help="Lines of context around each hunk in 'hunks' mode",
+    )
+
+    parser.add_argument(
+        "--prompt-layout",
+        choices=["user-first", "stable-first"],
+        default="user-first",
+        help="Put your note last so re-runs reuse Ollama's cached prompt prefix (stable-first)",
+    )
+    parser.add_argument(
+        "--compact-prompt",
+        action="store_true",
+        help="Shorter system prompt and changes marked inline in the file view instead of a separate diff",
+    )
+    parser.add_argument(
+        "--keep-alive",
+        type=str,
+        default=None,
+        help="How long Ollama keeps models and their prompt cache loaded, e.g. 30m or -1 (forever)",
+    )
+
+    parser.add_argument(
+        "--num-ctx",
+        type=int,
+        default=16_384,
+        help="Model context window; the prompt is packed to fit inside it",
+    )
+
+    parser.add_argument(
+        "--shard",
+        action="store_true",
+        help="Split large changesets into token-sized shards reviewed concurrently",
+    )
+    parser.add_argument(
+        "--shard-workers",
+        type=int,
+        default=2,
+        help="Concurrent shard reviews per model",
+    )
+
+    parser.add_argument(
+        "--no-lint-cache",
+        action="store_true",
+        help="Always re-run linters instead of reusing cached results",
+    )
+
+    parser.add_argument(
+        "--lint-scope",
+        choices=["changed", "all"],
+        default="changed",
+        help="Report linter findings near changed lines only, or in the whole file",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream model output, show issues as they arrive and stop once the JSON is complete",
+    )
+
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=None,
+        help="Comma-separated server base URLs to balance across (Ollama defaults to $OLLAMA_HOST)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=600.0,
+        help="Seconds to wait for data from Ollama before giving up",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Upper bound for the adaptive number of requests in flight per Ollama endpoint",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse model responses for identical requests (also $GIT_AGENT_LLM_CACHE=1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the response cache even if it is enabled in the environment",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=None,
+        help="GiB available for loaded models; larger model sets run in waves that fit",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["ollama", "openai"],
+        default="ollama",
+        help="Server API: Ollama, or an OpenAI-compatible server (llama.cpp, vLLM, LM Studio)",
+    )
+    parser.add_argument(
+        "--batch-prompts",
+        action="store_true",
+        help="With --backend openai, send all shards of a model to one host at once, as one batch",
+    )
+
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Try --models in order, cheapest first, and escalate only when a review is not a confident approval",
+    )
+    parser.add_argument(
+        "--cascade-min-confidence",
+        type=float,
+        default=0.7,
+        help="In cascade mode, escalate approvals below this confidence (0-1)",
+    )
+    parser.add_argument(
+        "--cascade-max-lines",
+        type=int,
+        default=400,
+        help="In cascade mode, diffs with more changed lines go straight to the last model",
+    )
+
+    parser.add_argument(
+        "--quorum",
+        type=int,
+        default=None,
+        help="Stop as soon as this many models agree on the approval status and cancel the rest",
+    )
+
+    parser.add_argument(
+        "-i",
+        "--interactive",
+        action="store_true",
+        help="After the review, ask the model follow-up questions about it",
+    )
+
     args = parser.parse_args(argv if argv is not None else sys.argv[1:])
 
     models = [m.strip() for m in (args.models or "").split(",") if m.strip()]
     user_context = " ".join(args.context or [])
 
+    # The defaults name an Ollama server and model; other servers have no common ones.
+    if args.backend == "openai":
+        if not args.host or not models:
+            parser.error("--backend openai needs --host and --models")
+        hosts = [normalize_host(h, None) for h in args.host.split(",") if h.strip()]
+    else:
+        host = args.host or os.getenv("OLLAMA_HOST", default_host)
+        hosts = [normalize_host(h) for h in host.split(",") if h.strip()] or [
+            default_host
+        ]
+
     if len(models) == 0:
         models.append(default_model)
 
+    if args.cascade and args.quorum is not None:
+        parser.error("--cascade runs one model at a time and cannot use --quorum")
+
+    if args.quorum is not None and not 1 <= args.quorum <= len(models):
+        parser.error(
+            f"--quorum must be between 1 and the number of models ({len(models)})"
+        )
+
     return Config(
         verbose=args.verbose,
         log_file=Path(args.log_file) if args.log_file else None,
         models=models,
         context=user_context,
+        content_source=args.content_source,
+        context_mode=args.context_mode,
+        context_window=args.context_window,
+        num_ctx=args.num_ctx,
+        shard=args.shard,
+        shard_workers=args.shard_workers,
+        lint_cache=not args.no_lint_cache,
+        lint_scope=args.lint_scope,
+        stream=args.stream,
+        ollama_hosts=hosts,
+        read_timeout=args.read_timeout,
+        max_concurrency=args.max_concurrency,
+        llm_cache=(args.cache or _env_flag("GIT_AGENT_LLM_CACHE"))
+        and not args.no_cache,
+        memory_budget=args.memory_budget,
+        backend=args.backend,
+        batch_prompts=args.batch_prompts,
+        cascade=args.cascade,
+        cascade_min_confidence=args.cascade_min_confidence,
+        cascade_max_lines=args.cascade_max_lines,
+        quorum=args.quorum,
+        prompt_layout=args.prompt_layout,
+        compact_prompt=args.compact_prompt,
+        keep_alive=args.keep_alive,
+        interactive=args.interactive,
     )
 
 
+def normalize_host(host: str, default_port: int | None = default_ollama_port) -> str:
+    """
+    Turns the forms Ollama accepts in OLLAMA_HOST (`127.0.0.1:11434`, `0.0.0.0`,
+    `localhost`) into a base URL. `0.0.0.0` is a bind address, so it maps to localhost.
+    """
+    host = host.strip().rstrip("/")
+    if "://" not in host:
+        host = f"http://{host}"
+        if default_port is not None and urlsplit(host).port is None:
+            host = f"{host}:{default_port}"
+
+    parts = urlsplit(host)
+    if parts.hostname == "0.0.0.0":
+        netloc = parts.netloc.replace("0.0.0.0", "localhost", 1)
+        host = parts._replace(netloc=netloc).geturl()
+    return host
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
 def setup_logger(verbose: bool = False, log_file: Path | None = None) -> None:
     logger.remove()
     level = "DEBUG" if verbose else "INFO"
@@ -7,7 +7,7 @@ from typing import TypedDict
 from pydantic import BaseModel, Field
 
 
-@dataclass
+@dataclass(slots=True)
 class FileContext:
     language: str
     content: str
@@ -25,12 +25,14 @@ class FileInfo(TypedDict):
     line_count: int
 
 
-@dataclass
+@dataclass(slots=True)
 class LintScoreIssue:
     file: str
     language: str
     linter: str
     message: str
+    line: int | None = None
+    column: int | None = None
 
 
 @dataclass
@@ -38,12 +40,48 @@ class LintScore:
     issues: list[LintScoreIssue]
     by_language: dict[str, list[LintScoreIssue]]
     linters_used: set[str]
+    outside_changes: int = 0
+    # The same findings counted per file, so a subset of files keeps its share.
+    outside_by_file: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class DiffHunk:
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+
+    @property
+    def new_end(self) -> int:
+        return self.new_start + max(self.new_count, 1) - 1
+
+
+@dataclass
+class FileDiff:
+    path: str
+    patch: str
+    additions: int = 0
+    deletions: int = 0
+    old_path: str | None = None
+    is_binary: bool = False
+    is_new: bool = False
+    is_deleted: bool = False
+    hunks: list[DiffHunk] = field(default_factory=list)
+
+    @property
+    def is_rename(self) -> bool:
+        return self.old_path is not None and self.old_path != self.path
 
 
 @dataclass
 class GitDiff:
     diff: str
     files_changed: list[str]
+    files: list[FileDiff] = field(default_factory=list)
+
+    def by_path(self) -> dict[str, FileDiff]:
+        return {f.path: f for f in self.files}
 
 
 @dataclass
@@ -52,6 +90,53 @@ class ReviewContext:
     files_changed: list[str]
     file_contents: dict[str, FileContext]
     linter_results: LintScore
+    file_diffs: dict[str, FileDiff] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ServerTiming:
+    """How long a server kept a request waiting before working on it, and then worked on it."""
+
+    queued_seconds: float
+    busy_seconds: float
+
+
+@dataclass
+class PromptEvalStats:
+    """
+    Ollama's prompt evaluation counters. Reuse is only known for a prompt whose part
+    without the user's note was sent before, in this run or an earlier one: its earlier
+    `prompt_eval_count` minus the new one is what came from the KV cache.
+    """
+
+    requests: int = 0
+    evaluated_tokens: int = 0
+    eval_seconds: float = 0.0
+    # Earlier counts of the repeated prompts, and what evaluating them again cost.
+    repeated_baseline_tokens: int = 0
+    repeated_evaluated_tokens: int = 0
+
+    def record(
+        self, evaluated: int, seconds: float, baseline: int | None = None
+    ) -> None:
+        self.requests += 1
+        self.evaluated_tokens += evaluated
+        self.eval_seconds += seconds
+        if baseline is not None:
+            self.repeated_baseline_tokens += baseline
+            self.repeated_evaluated_tokens += evaluated
+
+    @property
+    def reused_tokens(self) -> int:
+        return max(0, self.repeated_baseline_tokens - self.repeated_evaluated_tokens)
+
+    @property
+    def seconds_saved(self) -> float | None:
+        # A handful of evaluated tokens gives no usable per-token rate.
+        if self.evaluated_tokens < 32:
+            return None
+        return self.reused_tokens * self.eval_seconds / self.evaluated_tokens
 
 
 class SeverityLevel(str, Enum):
@@ -182,6 +267,9 @@ class CodeReviewResult(BaseModel):
     style_suggestions: list[StyleSuggestion] = Field(default_factory=list)
     commit_proposals: list[CommitMessage] = Field()
     approval_status: ApprovalStatus = Field()
+    confidence: float | None = Field(
+        default=None, description="How sure you are of approval_status, from 0 to 1"
+    )
     files_reviewed: int = Field()
     languages_detected: list[str] = Field()
     additional_notes: str | None = Field(default=None)
@@ -1,15 +1,30 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Protocol
+from collections.abc import Callable, Sequence
+from contextlib import AbstractAsyncContextManager
+from contextvars import ContextVar
+from typing import Protocol, runtime_checkable
 
 from git_agent.domain.models import (
     CodeReviewResult,
     FileContext,
     GitDiff,
     LintScore,
+    PromptEvalStats,
     ReviewContext,
+    ServerTiming,
 )
 from git_agent.domain.result import Result
 
+# Called with the top-level key of the array and the raw JSON of each completed element.
+ItemCallback = Callable[[str, str], None]
+
+# Set by backends whose server reports its timings, after each answer in the current task.
+server_timing: ContextVar[ServerTiming | None] = ContextVar(
+    "server_timing", default=None
+)
+
 
 class CodeReviewAgent(Protocol):
     def review_with_context(
@@ -19,6 +34,12 @@ class CodeReviewAgent(Protocol):
         pass
 
 
+class TokenEstimator(Protocol):
+    def count(self, text: str) -> int:
+        """Estimates how many tokens the model will use for the text."""
+        ...
+
+
 class GitProvider(ABC):
     @abstractmethod
     def get_diff(self, staged_only: bool = True) -> Result[GitDiff]:
@@ -31,10 +52,18 @@ class GitProvider(ABC):
 
 class FSProvider(ABC):
     @abstractmethod
-    def read_file(self, file_path: str, max_lines: int | None = None) -> Result[FileContext | None]:
+    def read_file(
+        self, file_path: str, max_lines: int | None = None
+    ) -> Result[FileContext | None]:
         """Reads a file and returns its content context."""
         pass
 
+    def read_files(
+        self, file_paths: list[str], max_lines: int | None = None
+    ) -> dict[str, Result[FileContext | None]]:
+        """Reads several files. Providers that can batch reads should override this."""
+        return {path: self.read_file(path, max_lines) for path in file_paths}
+
 
 class LinterProvider(ABC):
     @abstractmethod
@@ -43,19 +72,110 @@ class LinterProvider(ABC):
         pass
 
 
-class LLMProvider(ABC):
+class PreparedRequest(Protocol):
+    """A request body a backend's `prepare` encoded once, to send for any number of models."""
+
+    @property
+    def stream(self) -> bool: ...
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of what determines the answer, apart from the model."""
+        ...
+
+    @property
+    def estimated_tokens(self) -> int: ...
+
+    @property
+    def stable_fingerprint(self) -> str:
+        """Hash of the request without the user's note, empty if not known."""
+        ...
+
+
+class Endpoint(Protocol):
+    """One inference host."""
+
+    @property
+    def host(self) -> str: ...
+
+    @property
+    def healthy(self) -> bool: ...
+
+
+class EndpointPool[E: Endpoint](Protocol):
+    """Hosts serving the same models, handed out one request at a time."""
+
+    @property
+    def endpoints(self) -> Sequence[E]: ...
+
+    def lease(self, model: str) -> AbstractAsyncContextManager[E]:
+        """Picks a host for one request; a `ConnectionError` inside takes it out of rotation."""
+        ...
+
+    def mark_down(self, endpoint: E) -> None: ...
+
+
+class AsyncLLMProvider[E: Endpoint, R: PreparedRequest](ABC):
+    pool: EndpointPool[E]
+    # Prompt evaluation counters, for backends that report them.
+    prompt_eval: PromptEvalStats | None = None
+
     @abstractmethod
-    def generate(
+    async def generate(
         self,
         prompt: str,
         system: str | None = None,
         temperature: float = 0.5,
         max_tokens: int = 2000,
     ) -> str:
-        """Generates text using an LLM."""
+        """Generates text using an LLM without blocking the event loop."""
+        pass
+
+    @abstractmethod
+    async def generate_prepared(
+        self,
+        prepared: R,
+        on_item: ItemCallback | None = None,
+        endpoint: E | None = None,
+    ) -> str:
+        """Sends a request built once by the backend's `prepare`, to `endpoint` or the first host."""
+        pass
+
+    @abstractmethod
+    async def chat(
+        self,
+        messages: list[dict[str, str]],
+        schema: dict | None = None,
+        max_tokens: int = 4096,
+        endpoint: E | None = None,
+    ) -> str:
+        """Continues a conversation, optionally constrained to a JSON schema."""
+        pass
+
+    async def cached(self, prepared: R) -> str | None:
+        """The stored answer to this request, for backends with a response cache."""
+        return None
+
+    @abstractmethod
+    async def release(self) -> None:
+        """Frees the model's server resources once it is no longer needed."""
         pass
 
     @abstractmethod
-    def is_available(self) -> bool:
+    async def is_available(self) -> bool:
         """Checks if the LLM service is available."""
         pass
+
+
+@runtime_checkable
+class PromptBatcher[E: Endpoint, R: PreparedRequest](Protocol):
+    """An `AsyncLLMProvider` that can answer several prepared requests as one batch."""
+
+    # Batching is opt-in; a backend able to batch may still send prompts one by one.
+    batch_prompts: bool
+
+    async def generate_batch(
+        self, requests: list[R], endpoint: E | None = None
+    ) -> list[str]:
+        """Answers `requests` in order, from the response cache where possible."""
+        ...
@@ -1,3 +1,7 @@
+from typing import Any
+
+from pydantic import BaseModel
+
 from git_agent.domain.models import CodeReviewResult
 
 SENIOR_DEV_PROMPT = """
@@ -11,7 +15,7 @@ You will receive:
 
 1. **User Context**: Additional instructions from the developer.
 2. **Git Diff**: The raw changes.
-3. **File Context**: The full content of modified files with LINE NUMBERS (format: `line_number | content`).
+3. **File Context**: The content of modified files with LINE NUMBERS (format: `line_number | content`). It is either the full file or excerpts around each change separated by `...`; line numbers always match the real file.
 4. **Linter Results**: Automated checks. Trust these results; do not hallucinate linter errors if they say "passed".
 
 ### REVIEW GUIDELINES
@@ -20,6 +24,7 @@ You will receive:
 2. **Be Specific**: When citing a bug, you MUST refer to an existing line number from the "File Context".
 3. **Fail Closed**: If you find a `critical` bug (security, data loss, crash), the status MUST be `rejected`.
 4. **Language**: Write the human explanations in the language detected in the code (e.g., Spanish for Spanish comments, English otherwise).
+5. **Confidence**: Set `confidence` low when the change is outside what you can judge from the given context.
 
 ### EXAMPLE COMMIT SUGGESTIONS
 
@@ -39,3 +44,66 @@ feat: add git-agent CLI tool for AI-powered code review
 You must output a single valid JSON object. Do not include markdown formatting (```json) outside the object. This is the Json Schema:
 
 """ + str(CodeReviewResult.model_json_schema())
+
+
+def schema_signature(model: type[BaseModel]) -> str:
+    """
+    A terse, TypeScript-like rendering of a model's JSON schema, one line per object,
+    e.g. `CodeIssue{file:string,line:integer,code_snippet?:string|null}`.
+    """
+    schema = model.model_json_schema()
+    defs = schema.get("$defs", {})
+    lines = [_object_signature(model.__name__, schema)]
+    for name, definition in defs.items():
+        if "properties" in definition:
+            lines.append(_object_signature(name, definition))
+        elif "enum" in definition:
+            lines.append(f"{name}={_type_signature(definition)}")
+    return "\n".join(lines)
+
+
+def _object_signature(name: str, schema: dict[str, Any]) -> str:
+    required = set(schema.get("required", []))
+    fields = [
+        f"{field}{'' if field in required else '?'}:{_type_signature(prop)}"
+        for field, prop in schema["properties"].items()
+    ]
+    return f"{name}{{{','.join(fields)}}}"
+
+
+def _type_signature(prop: dict[str, Any]) -> str:
+    if "$ref" in prop:
+        return prop["$ref"].rsplit("/", 1)[-1]
+    if "anyOf" in prop:
+        return "|".join(_type_signature(p) for p in prop["anyOf"])
+    if "enum" in prop:
+        return "|".join(f'"{v}"' for v in prop["enum"])
+    if prop.get("type") == "array":
+        return f"{_type_signature(prop.get('items', {}))}[]"
+    return prop.get("type", "any")
+
+
+COMPACT_SENIOR_DEV_PROMPT = """
+### ROLE
+Pragmatic Senior Software Architect and Security Auditor: robustness, maintainability and security over trivial style.
+
+### INPUT
+1. **User Context**: extra instructions from the developer.
+2. **File Context**: modified files with LINE NUMBERS (`line_number | content`), full or as excerpts separated by `...`. Changes are marked inline: `12+| code` is an added or changed line, `  -| code` a removed line (it has no number in the new file). Only files that cannot be shown this way come as a separate Git Diff.
+3. **Linter Results**: trust them; do not invent linter errors.
+
+### RULES
+1. Approve good code; do not invent bugs.
+2. Cite existing line numbers from the File Context.
+3. Any `critical` bug (security, data loss, crash) means `rejected`.
+4. Write explanations in the language of the code's comments (English otherwise).
+5. Set `confidence` low when the context is not enough to judge.
+6. Commit proposals follow Conventional Commits (`type(scope): description`, optional bullet body).
+
+### OUTPUT
+A single JSON object, no markdown fences, matching (`?` = optional, types as in JSON Schema):
+""" + schema_signature(CodeReviewResult)
+
+
+def system_prompt(compact: bool = False) -> str:
+    return COMPACT_SENIOR_DEV_PROMPT if compact else SENIOR_DEV_PROMPT
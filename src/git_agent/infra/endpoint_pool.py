@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+import httpx
+from loguru import logger
+
+from git_agent.infra.http_client import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    HostClient,
+    async_client,
+)
+
+DEFAULT_COOLDOWN_SECONDS = 30.0
+# The only status that says the host, rather than the request, is unusable.
+UNAVAILABLE_STATUS = 503
+
+# Returns the installed and the loaded models of a host, with their sizes in bytes.
+Inspector = Callable[
+    [httpx.AsyncClient], Awaitable[tuple[dict[str, int], dict[str, int]]]
+]
+
+
+def model_key(name: str) -> str:
+    """Ollama lists implicit tags in full, e.g. "llama3" as "llama3:latest"."""
+    return name if ":" in name else f"{name}:latest"
+
+
+class LLMResponseError(RuntimeError):
+    """A host rejected one request, e.g. with 404 for a model it has not pulled."""
+
+    def __init__(self, host: str, status_code: int, message: str):
+        super().__init__(message)
+        self.host = host
+        self.status_code = status_code
+
+
+def request_error(host: str, error: httpx.HTTPError) -> Exception:
+    """
+    Maps a failed request to `ConnectionError` when the host is unreachable, timed out
+    or overloaded, and to `LLMResponseError` for any other error status.
+    """
+    if (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code != UNAVAILABLE_STATUS
+    ):
+        return LLMResponseError(
+            host,
+            error.response.status_code,
+            f"{host} answered {error.response.status_code}: {error}",
+        )
+    return ConnectionError(f"Error connecting to {host}: {error}")
+
+
+@dataclass
+class Endpoint:
+    host: str
+    client: HostClient
+    # Model sizes in bytes, keyed by `model_key`; `installed` is None until first checked.
+    loaded: dict[str, int] = field(default_factory=dict)
+    installed: dict[str, int] | None = None
+    assigned: int = 0
+    down_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class EndpointPool:
+    """
+    A set of inference hosts serving the same models, Ollama by default. Requests go
+    to the least busy healthy host that already has the model loaded, then to any
+    healthy host that has it installed. A host that fails is skipped for `cooldown` seconds.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        cooldown: float = DEFAULT_COOLDOWN_SECONDS,
+        inspect: Inspector | None = None,
+    ):
+        if not endpoints:
+            raise ValueError("An endpoint pool needs at least one host")
+        self.endpoints = endpoints
+        self.cooldown = cooldown
+        self.inspect = inspect or inspect_ollama
+
+    @classmethod
+    def connect(
+        cls,
+        hosts: list[str],
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        cooldown: float = DEFAULT_COOLDOWN_SECONDS,
+        inspect: Inspector | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> EndpointPool:
+        return cls(
+            [
+                Endpoint(
+                    host.rstrip("/"),
+                    async_client(
+                        host,
+                        connect_timeout,
+                        read_timeout,
+                        pool_size=pool_size,
+                        headers=headers,
+                    ),
+                )
+                for host in hosts
+            ],
+            cooldown,
+            inspect,
+        )
+
+    async def refresh(self) -> None:
+        """Health-checks every host and records which models each has installed and loaded."""
+        await asyncio.gather(*(self._check(endpoint) for endpoint in self.endpoints))
+
+    def healthy_hosts(self) -> list[str]:
+        return [e.host for e in self.endpoints if e.healthy]
+
+    def loaded_models(self) -> dict[str, int]:
+        return {k: v for e in self.endpoints if e.healthy for k, v in e.loaded.items()}
+
+    def installed_models(self) -> dict[str, int]:
+        return {
+            k: v
+            for e in self.endpoints
+            if e.healthy
+            for k, v in (e.installed or {}).items()
+        }
+
+    def choose(self, model: str) -> Endpoint:
+        key = model_key(model)
+        # With every host down, trying one beats failing without a request.
+        candidates = [e for e in self.endpoints if e.healthy] or list(self.endpoints)
+        serving = [e for e in candidates if e.installed is None or key in e.installed]
+
+        return min(
+            serving or candidates,
+            key=lambda e: (key not in e.loaded, e.assigned, e.down_until),
+        )
+
+    @asynccontextmanager
+    async def lease(self, model: str) -> AsyncIterator[Endpoint]:
+        """
+        Picks a host for one request and tracks the outcome. Only a `ConnectionError`
+        takes the host out of rotation; other errors concern the request alone.
+        """
+        endpoint = self.choose(model)
+        endpoint.assigned += 1
+
+        try:
+            yield endpoint
+        except ConnectionError:
+            self.mark_down(endpoint)
+            raise
+        else:
+            endpoint.loaded.setdefault(model_key(model), 0)
+        finally:
+            endpoint.assigned -= 1
+
+    def mark_down(self, endpoint: Endpoint) -> None:
+        if len(self.endpoints) > 1:
+            logger.warning(
+                f"{endpoint.host} failed; skipping it for {self.cooldown:.0f}s"
+            )
+        endpoint.down_until = time.monotonic() + self.cooldown
+        endpoint.loaded.clear()
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(e.client.aclose() for e in self.endpoints))
+
+    async def _check(self, endpoint: Endpoint) -> None:
+        try:
+            endpoint.installed, endpoint.loaded = await self.inspect(endpoint.client)
+            endpoint.down_until = 0.0
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.debug(f"Health check of {endpoint.host} failed: {e}")
+            self.mark_down(endpoint)
+
+
+async def inspect_ollama(
+    client: httpx.AsyncClient,
+) -> tuple[dict[str, int], dict[str, int]]:
+    tags, ps = await asyncio.gather(
+        client.get("/api/tags", timeout=5), client.get("/api/ps", timeout=5)
+    )
+    tags.raise_for_status()
+    # Older servers without /api/ps are still usable.
+    loaded = _sizes(ps.json()) if ps.status_code == 200 else {}
+    return _sizes(tags.json()), loaded
+
+
+def _sizes(data: dict) -> dict[str, int]:
+    return {
+        model_key(entry["name"]): entry.get("size", 0)
+        for entry in data.get("models", [])
+    }
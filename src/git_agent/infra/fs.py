@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import cast
 
@@ -22,31 +23,53 @@ class FSAdapter(FSProvider):
                 logger.debug(f"Skipping ignored file: {path.name}")
                 return Res.ok(cast(FileContext | None, None), "File ignored by policy")
 
-            lines = path.read_text(encoding="utf-8").splitlines()
+            return build_file_context(
+                file_path, path.read_text(encoding="utf-8"), max_lines
+            )
+        except Exception as e:
+            return Res.err(f"Error read {file_path}. Cause: {e!s}")
 
-            if not lines:
-                return Res.ok(cast(FileContext | None, None), "File is empty")
+    def read_files(
+        self, file_paths: list[str], max_lines: int | None = None
+    ) -> dict[str, Result[FileContext | None]]:
+        if len(file_paths) < 2:
+            return super().read_files(file_paths, max_lines)
 
-            max_lines = max_lines or len(lines)
-            skipped_lines = len(lines) - max_lines
-            lines = lines[:max_lines]
+        with ThreadPoolExecutor(max_workers=min(8, len(file_paths))) as executor:
+            results = executor.map(lambda p: self.read_file(p, max_lines), file_paths)
+            return dict(zip(file_paths, results, strict=True))
 
-            if skipped_lines:
-                lines.append(f"{skipped_lines} skipped lines")
+    def _is_ignored(self, file_path: str) -> bool:
+        return is_ignored(file_path)
 
-            language = detect_language(file_path)
-            data = FileContext(language=language, lines=lines)
 
-            return Res.ok(
-                cast(FileContext | None, data),
-                f"Read file. {data.line_count} lines read, language: {data.language}",
-            )
-        except Exception as e:
-            return Res.err(f"Error read {file_path}. Cause: {e!s}")
+def build_file_context(
+    file_path: str, text: str, max_lines: int | None = None
+) -> Result[FileContext | None]:
+    lines = text.splitlines()
 
-    def _is_ignored(self, file_path: str) -> bool:
-        path = Path(file_path)
-        return path.name in IGNORED_FILES or path.suffix in IGNORED_EXTENSIONS
+    if not lines:
+        return Res.ok(cast(FileContext | None, None), "File is empty")
+
+    max_lines = max_lines or len(lines)
+    skipped_lines = len(lines) - max_lines
+    lines = lines[:max_lines]
+
+    if skipped_lines:
+        lines.append(f"{skipped_lines} skipped lines")
+
+    language = detect_language(file_path)
+    data = FileContext(language=language, lines=lines)
+
+    return Res.ok(
+        cast(FileContext | None, data),
+        f"Read file. {data.line_count} lines read, language: {data.language}",
+    )
+
+
+def is_ignored(file_path: str) -> bool:
+    path = Path(file_path)
+    return path.name in IGNORED_FILES or path.suffix in IGNORED_EXTENSIONS
 
 
 LANGUAGE_MAP = {
@@ -78,7 +101,19 @@ def detect_language(r_file_path: str) -> str:
 
 
 IGNORED_FILES = {"package-lock.json", "yarn.lock", "pnpm-lock.yaml", "uv.lock"}
-IGNORED_EXTENSIONS = {".lock", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".ico", ".pdf", ".zip", ".tar", ".gz"}
+IGNORED_EXTENSIONS = {
+    ".lock",
+    ".svg",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".ico",
+    ".pdf",
+    ".zip",
+    ".tar",
+    ".gz",
+}
 
 
 def read_file_context(
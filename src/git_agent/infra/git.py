@@ -1,51 +1,139 @@
+import re
 import subprocess
 
-from git_agent.domain.models import GitDiff
+from git_agent.domain.models import DiffHunk, FileDiff, GitDiff
 from git_agent.domain.ports import GitProvider
 from git_agent.domain.result import Res, Result
 
+HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
 
 class GitAdapter(GitProvider):
     def get_diff(self, staged_only: bool = True) -> Result[GitDiff]:
         try:
-            git_diff_cmd = ["git", "diff", "--no-color", "--unified=0"]
-
-            subprocess.run(
-                ["git", "rev-parse", "--git-dir"],
-                check=True,
-                capture_output=True,
-            )
+            # Single invocation: NUL-separated numstat records followed by the patch.
+            git_diff_cmd = [
+                "git",
+                "diff",
+                "--no-color",
+                "--unified=0",
+                "--find-renames",
+                "-z",
+                "--numstat",
+                "--patch",
+            ]
 
             if staged_only:
                 git_diff_cmd.append("--staged")
 
-            result = subprocess.run(git_diff_cmd, capture_output=True, text=True)
-            diff = result.stdout
+            result = subprocess.run(git_diff_cmd, capture_output=True, check=True)
+            data = parse_diff(result.stdout)
 
-            if not diff.strip():
-                files_changed = self._get_files_changed(staged_only)
-                if not files_changed:
-                    return Res.err("No changes detected")
-            else:
-                 files_changed = self._get_files_changed(staged_only)
-
-            data = GitDiff(diff=diff, files_changed=files_changed)
+            if not data.files:
+                return Res.err("No changes detected")
 
             return Res.ok(data)
         except FileNotFoundError:
             return Res.err("Git not found")
         except subprocess.CalledProcessError:
-             return Res.err("Not a git repository")
+            return Res.err("Not a git repository")
         except Exception as e:
             return Res.err(f"Unexpected error: {e!s}")
 
-    def _get_files_changed(self, staged_only: bool) -> list[str]:
-        cmd = ["git", "diff", "--name-only"]
 
-        if staged_only:
-            cmd.append("--staged")
+def parse_diff(raw: bytes) -> GitDiff:
+    """Parses the output of `git diff -z --numstat --patch` into a GitDiff."""
+    entries, patch = _split_numstat(raw)
+    blocks = _split_patch(patch)
+
+    files: list[FileDiff] = []
+    for idx, (added, deleted, old_path, path) in enumerate(entries):
+        block = blocks[idx] if idx < len(blocks) else ""
+        is_binary = added == "-" and deleted == "-"
+        file_diff = FileDiff(
+            path=path,
+            patch=block,
+            additions=0 if is_binary else int(added),
+            deletions=0 if is_binary else int(deleted),
+            old_path=old_path,
+            is_binary=is_binary,
+        )
+        _parse_block(block, file_diff)
+        files.append(file_diff)
+
+    return GitDiff(diff=patch, files_changed=[f.path for f in files], files=files)
+
+
+def _split_numstat(raw: bytes) -> tuple[list[tuple[str, str, str | None, str]], str]:
+    entries: list[tuple[str, str, str | None, str]] = []
+    pos = 0
+
+    while pos < len(raw):
+        end = raw.find(b"\0", pos)
+        if end == -1:
+            break
+
+        record = raw[pos:end]
+        pos = end + 1
+        if not record:
+            # An empty record separates the numstat section from the patch.
+            break
+
+        added, deleted, path = _decode(record).split("\t", 2)
+        old_path: str | None = None
+
+        if not path:
+            # Renames are written as "added\tdeleted\t\0old\0new\0".
+            old_end = raw.index(b"\0", pos)
+            new_end = raw.index(b"\0", old_end + 1)
+            old_path = _decode(raw[pos:old_end])
+            path = _decode(raw[old_end + 1 : new_end])
+            pos = new_end + 1
+
+        entries.append((added, deleted, old_path, path))
+
+    return entries, _decode(raw[pos:])
+
+
+def _split_patch(patch: str) -> list[str]:
+    blocks: list[str] = []
+    current: list[str] = []
+
+    for line in patch.splitlines(keepends=True):
+        if line.startswith("diff --git ") and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+
+    if current:
+        blocks.append("".join(current))
+
+    return blocks
+
+
+def _parse_block(block: str, file_diff: FileDiff) -> None:
+    for line in block.splitlines():
+        if line.startswith("@@"):
+            match = HUNK_HEADER_RE.match(line)
+            if not match:
+                continue
+            old_start, old_count, new_start, new_count = match.groups()
+            file_diff.hunks.append(
+                DiffHunk(
+                    old_start=int(old_start),
+                    old_count=int(old_count) if old_count is not None else 1,
+                    new_start=int(new_start),
+                    new_count=int(new_count) if new_count is not None else 1,
+                )
+            )
+        elif file_diff.hunks:
+            # Header lines only appear before the first hunk.
+            continue
+        elif line.startswith("new file mode"):
+            file_diff.is_new = True
+        elif line.startswith("deleted file mode"):
+            file_diff.is_deleted = True
 
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
 
-        files = result.stdout.strip().splitlines()
-        return files
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace")
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import contextlib
+import subprocess
+import threading
+from typing import IO, cast
+
+from loguru import logger
+
+from git_agent.domain.models import FileContext
+from git_agent.domain.ports import FSProvider
+from git_agent.domain.result import Res, Result
+from git_agent.infra.fs import build_file_context, is_ignored
+
+BINARY_SNIFF_BYTES = 8000
+
+
+class GitIndexAdapter(FSProvider):
+    """Reads staged file content from the git index through one `git cat-file --batch` process."""
+
+    def __init__(self):
+        self._process: subprocess.Popen[bytes] | None = None
+        self._lock = threading.Lock()
+
+    def read_file(
+        self, file_path: str, max_lines: int | None = None
+    ) -> Result[FileContext | None]:
+        return self.read_files([file_path], max_lines)[file_path]
+
+    def read_files(
+        self, file_paths: list[str], max_lines: int | None = None
+    ) -> dict[str, Result[FileContext | None]]:
+        results: dict[str, Result[FileContext | None]] = {}
+        to_read: list[str] = []
+
+        for path in file_paths:
+            if is_ignored(path):
+                logger.debug(f"Skipping ignored file: {path}")
+                results[path] = Res.ok(
+                    cast(FileContext | None, None), "File ignored by policy"
+                )
+            else:
+                to_read.append(path)
+
+        if not to_read:
+            return results
+
+        try:
+            blobs = self._cat_files(to_read)
+        except FileNotFoundError:
+            return results | {path: Res.err("Git not found") for path in to_read}
+        except Exception as e:
+            self.close()
+            return results | {
+                path: Res.err(f"Error reading {path} from index. Cause: {e!s}")
+                for path in to_read
+            }
+
+        for path in to_read:
+            blob = blobs.get(path)
+
+            if blob is None:
+                results[path] = Res.err(f"File not found in index. Path: {path}")
+            elif b"\0" in blob[:BINARY_SNIFF_BYTES]:
+                results[path] = Res.ok(cast(FileContext | None, None), "Binary file")
+            else:
+                try:
+                    results[path] = build_file_context(
+                        path, blob.decode("utf-8"), max_lines
+                    )
+                except UnicodeDecodeError as e:
+                    results[path] = Res.err(f"Error read {path}. Cause: {e!s}")
+
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process is None:
+                return
+            if self._process.stdin:
+                self._process.stdin.close()
+            self._process.wait(timeout=5)
+            self._process = None
+
+    def __enter__(self) -> GitIndexAdapter:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def _cat_files(self, file_paths: list[str]) -> dict[str, bytes | None]:
+        # The batch protocol is line based, so a path with a newline is resolved
+        # to its blob id first and asked for by id.
+        names = {
+            path: _index_object_id(path) if "\n" in path else f":{path}"
+            for path in file_paths
+        }
+        blobs: dict[str, bytes | None] = {
+            path: None for path, name in names.items() if name is None
+        }
+        file_paths = [path for path in file_paths if names[path] is not None]
+        if not file_paths:
+            return blobs
+
+        with self._lock:
+            process = self._ensure_process()
+            stdin = cast(IO[bytes], process.stdin)
+            stdout = cast(IO[bytes], process.stdout)
+
+            # `:<path>` names the stage-0 index entry, so git resolves the staged
+            # blob itself. Requests are written from a separate thread so a large
+            # batch cannot deadlock on full pipe buffers while we read answers.
+            request = "".join(f"{names[path]}\n" for path in file_paths).encode("utf-8")
+            writer = threading.Thread(target=_write_all, args=(stdin, request))
+            writer.start()
+
+            try:
+                return blobs | _read_blobs(stdout, file_paths)
+            except BaseException:
+                # Killing git unblocks a writer stuck on a full pipe.
+                process.kill()
+                self._process = None
+                raise
+            finally:
+                writer.join()
+                if self._process is None:
+                    with contextlib.suppress(OSError):
+                        stdin.close()
+                    stdout.close()
+                    process.wait()
+
+    def _ensure_process(self) -> subprocess.Popen[bytes]:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+
+def _index_object_id(path: str) -> str | None:
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f":{path}"],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _read_blobs(stdout: IO[bytes], file_paths: list[str]) -> dict[str, bytes | None]:
+    blobs: dict[str, bytes | None] = {}
+    for path in file_paths:
+        header = stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file exited unexpectedly")
+
+        fields = header.split()
+        if fields[-1] == b"missing" or len(fields) != 3:
+            blobs[path] = None
+            continue
+
+        size = int(fields[2])
+        blobs[path] = stdout.read(size)
+        stdout.read(1)  # Trailing newline after each object.
+    return blobs
+
+
+def _write_all(stream: IO[bytes], data: bytes) -> None:
+    # A dead process is reported by the reader; the writer just stops.
+    with contextlib.suppress(OSError, ValueError):
+        stream.write(data)
+        stream.flush()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import random
+
+import httpx
+from loguru import logger
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+# Generous: CPU-only hosts can take minutes to evaluate a large prompt.
+DEFAULT_READ_TIMEOUT = 600.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_POOL_SIZE = 16
+
+
+class JitteredRetryTransport(httpx.AsyncBaseTransport):
+    """Retries requests that could not connect, with full-jitter exponential backoff."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        self.transport = transport
+        self.retries = retries
+        self.backoff = backoff
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                return await self.transport.handle_async_request(request)
+            except httpx.ConnectError, httpx.ConnectTimeout:
+                # Nothing was sent yet, so any method is safe to retry.
+                if attempt >= self.retries:
+                    raise
+                # Full jitter keeps concurrent requests from retrying in lockstep.
+                delay = random.uniform(0, self.backoff * 2**attempt)
+                attempt += 1
+                logger.debug(
+                    f"Connection to {request.url.host} failed, retrying in "
+                    f"{delay:.2f}s ({attempt}/{self.retries})"
+                )
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class HostClient(httpx.AsyncClient):
+    """Keep-alive client for one host that remembers whether the host answered."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._available: bool | None = None
+        self._probe: asyncio.Lock | None = None
+
+    async def is_available(self, path: str) -> bool:
+        """Probes `path` once; the answer is reused for the rest of the run."""
+        if self._available is None:
+            self._probe = self._probe or asyncio.Lock()
+            async with self._probe:
+                if self._available is None:
+                    try:
+                        response = await self.get(path, timeout=self.timeout.connect)
+                        self._available = response.status_code == 200
+                    except httpx.HTTPError:
+                        self._available = False
+        return self._available
+
+
+def async_client(
+    host: str,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    headers: dict[str, str] | None = None,
+    backoff: float = DEFAULT_BACKOFF,
+) -> HostClient:
+    """
+    Pooled client with separate connect and read timeouts and jittered retries on
+    connection errors, meant to be shared by every model talking to `host`.
+    """
+    return HostClient(
+        base_url=host.rstrip("/"),
+        headers=headers,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        # A client ignores `limits` once given a transport; the transport holds the pool.
+        transport=JitteredRetryTransport(
+            httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=pool_size, max_keepalive_connections=pool_size
+                )
+            ),
+            retries=retries,
+            backoff=backoff,
+        ),
+    )
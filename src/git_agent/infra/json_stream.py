@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+
+from git_agent.domain.ports import ItemCallback
+
+
+class IncrementalJSONScanner:
+    """
+    Scans a JSON object as it streams in, without re-parsing the buffer on every chunk.
+    Reports each object element of a top-level array as soon as it closes and knows
+    when the top-level object itself is complete.
+    """
+
+    def __init__(self, on_item: ItemCallback | None = None):
+        self.on_item = on_item
+        self.done = False
+        self.end = 0
+        self._buffer: list[str] = []
+        self._length = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = ""
+        self._key = ""
+        self._array_key = ""
+        self._item_start = -1
+
+    @property
+    def text(self) -> str:
+        text = "".join(self._buffer)
+        return text[: self.end] if self.done else text
+
+    def feed(self, chunk: str) -> bool:
+        """Consumes a chunk and returns True once the top-level object has closed."""
+        if self.done or not chunk:
+            return self.done
+
+        offset = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+
+        for i, char in enumerate(chunk, offset):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_string = self._slice(self._string_start + 1, i)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":" and len(self._stack) == 1:
+                self._key = self._last_string
+            elif char in "{[":
+                self._stack.append(char)
+                if char == "[" and len(self._stack) == 2:
+                    self._array_key = self._key
+                elif (
+                    char == "{"
+                    and self._stack[:2] == ["{", "["]
+                    and len(self._stack) == 3
+                ):
+                    self._item_start = i
+            elif char in "}]":
+                if not self._stack:
+                    continue
+                closing = self._stack.pop()
+                if closing == "{" and len(self._stack) == 2 and self._item_start >= 0:
+                    if self.on_item:
+                        self.on_item(
+                            self._array_key, self._slice(self._item_start, i + 1)
+                        )
+                    self._item_start = -1
+                elif not self._stack:
+                    self.done = True
+                    self.end = i + 1
+                    return True
+
+        return False
+
+    def _slice(self, start: int, end: int) -> str:
+        if len(self._buffer) > 1:
+            self._buffer = ["".join(self._buffer)]
+        return self._buffer[0][start:end]
+
+
+def replay(text: str, on_item: ItemCallback | None) -> None:
+    """Fires the streaming callbacks for a response that was not streamed, e.g. a cached one."""
+    if on_item:
+        IncrementalJSONScanner(on_item).feed(text)
+
+
+def is_complete_json(text: str) -> bool:
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+
+from loguru import logger
+
+from git_agent.domain.models import LintScoreIssue
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "git-agent"
+
+
+def blob_hash(data: bytes) -> str:
+    """Same object id git assigns to the content, without spawning git."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def files_hash(paths: list[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        file = Path(path)
+        if file.is_file():
+            digest.update(path.encode())
+            digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+class LintCache:
+    """On-disk lint results keyed by content, linter version and linter config, with LRU eviction."""
+
+    def __init__(
+        self, directory: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = directory or default_cache_dir() / "lint"
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(path: str, content_hash: str, linter_version: str, config_hash: str) -> str:
+        raw = "\0".join([path, content_hash, linter_version, config_hash])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str, r_file_path: str) -> list[LintScoreIssue] | None:
+        entry = self._entry_path(key)
+        try:
+            records = json.loads(entry.read_text(encoding="utf-8"))
+            # Touching the entry keeps eviction least-recently-used.
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Discarding unreadable lint cache entry {key}: {e}")
+            entry.unlink(missing_ok=True)
+            return None
+
+        return [LintScoreIssue(**{**record, "file": r_file_path}) for record in records]
+
+    def put(self, entries: dict[str, list[LintScoreIssue]]) -> None:
+        try:
+            for key, issues in entries.items():
+                entry = self._entry_path(key)
+                entry.parent.mkdir(parents=True, exist_ok=True)
+                tmp = entry.with_suffix(".tmp")
+                tmp.write_text(
+                    json.dumps([asdict(i) for i in issues]), encoding="utf-8"
+                )
+                tmp.replace(entry)
+            if entries:
+                self._evict()
+        except OSError as e:
+            logger.debug(f"Could not write lint cache: {e}")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _evict(self) -> None:
+        entries = [(p, p.stat()) for p in self.directory.glob("*/*.json")]
+        total = sum(stat.st_size for _, stat in entries)
+        if total <= self.max_bytes:
+            return
+
+        for path, stat in sorted(entries, key=lambda e: e[1].st_mtime):
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            if total <= self.max_bytes:
+                break
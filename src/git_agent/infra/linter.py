@@ -1,23 +1,38 @@
+import json
+import os
 import subprocess
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from pathlib import Path
 
 from git_agent.domain.models import LintScore, LintScoreIssue
 from git_agent.domain.ports import LinterProvider
 from git_agent.domain.result import Res, Result
 from git_agent.infra.fs import detect_language
+from git_agent.infra.lint_cache import LintCache, blob_hash, files_hash
+
+LINTER_TIMEOUT_SECONDS = 120
 
 
 class LinterAdapter(LinterProvider):
+    def __init__(self, cache: LintCache | None = None):
+        self.cache = cache
+
     def run_linter(self, file_paths: list[str]) -> Result[LintScore]:
         all_issues: list[LintScoreIssue] = []
         by_language = defaultdict(list)
         linters_used: set[str] = set()
 
-        for f in file_paths:
-            file_issues = self._process_file(f)
-            if not file_issues:
-                continue
+        groups = self._group_by_linter(file_paths)
+
+        # One process per linter; different linters run concurrently.
+        with ThreadPoolExecutor(max_workers=max(1, len(groups))) as executor:
+            group_issues = list(
+                executor.map(lambda item: self._run_group(*item), groups.items())
+            )
 
+        for file_issues in group_issues:
             all_issues.extend(file_issues)
             for issue in file_issues:
                 linters_used.add(issue.linter)
@@ -36,52 +51,196 @@ class LinterAdapter(LinterProvider):
 
         return Res.ok(data, message=" | ".join(message_parts))
 
-    def _process_file(self, r_file_path: str) -> list[LintScoreIssue]:
-        linter_lang = detect_language(r_file_path)
-        if linter_lang == "unknown":
-            return []
+    def _group_by_linter(
+        self, file_paths: list[str]
+    ) -> dict[tuple[str, ...], dict[str, str]]:
+        groups: dict[tuple[str, ...], dict[str, str]] = defaultdict(dict)
 
-        cmd_base = linter_commands.get(linter_lang)
-        if not cmd_base:
-            return []
+        for r_file_path in file_paths:
+            linter_lang = detect_language(r_file_path)
+            cmd_base = linter_commands.get(linter_lang)
+            if not cmd_base:
+                continue
+            groups[tuple(cmd_base)][r_file_path] = linter_lang
+
+        return groups
+
+    def _run_group(
+        self, cmd_base: tuple[str, ...], files: dict[str, str]
+    ) -> list[LintScoreIssue]:
+        linter_name = _linter_name(cmd_base)
+        cached, cache_keys = self._lookup_cache(cmd_base, files)
+        pending = {f: lang for f, lang in files.items() if f not in cached}
 
-        linter_cmd = [*cmd_base, r_file_path]
-        linter_name = linter_cmd[0]
+        if not pending:
+            return [issue for issues in cached.values() for issue in issues]
+
+        linter_cmd = [*cmd_base, *pending]
 
         try:
             result = subprocess.run(
-                linter_cmd, capture_output=True, text=True, timeout=30
+                linter_cmd,
+                capture_output=True,
+                text=True,
+                timeout=LINTER_TIMEOUT_SECONDS,
             )
 
-            output = result.stderr.strip()
-            if not output:
-                return []
+            records: list[LintRecord] = []
+            if result.stdout.strip():
+                records = linter_parsers[linter_name](json.loads(result.stdout))
+            elif result.returncode != 0 and result.stderr.strip():
+                first_line = result.stderr.strip().splitlines()[0]
+                return _issue_per_file(pending, linter_name, f"❌ Error: {first_line}")
+        except FileNotFoundError, subprocess.TimeoutExpired:
+            return _issue_per_file(pending, linter_name, "Linter timeout or not found")
+        except Exception as e:
+            return _issue_per_file(pending, linter_name, f"❌ Error: {e!s}")
 
-            return [
+        by_abs_path = {os.path.abspath(f): f for f in pending}
+        fresh: dict[str, list[LintScoreIssue]] = {f: [] for f in pending}
+
+        for filename, line, column, code, message in records:
+            r_file_path = by_abs_path.get(os.path.abspath(filename), filename)
+            fresh.setdefault(r_file_path, []).append(
                 LintScoreIssue(
                     file=r_file_path,
-                    language=linter_lang,
+                    language=files.get(r_file_path, detect_language(r_file_path)),
                     linter=linter_name,
-                    message=line.strip(),
+                    message=f"{code} {message}" if code else message,
+                    line=line,
+                    column=column,
                 )
-                for line in output.splitlines()
-                if line.strip()
-            ]
+            )
 
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            return [
-                LintScoreIssue(
-                    r_file_path, linter_lang, linter_name, "Linter timeout or not found"
-                )
-            ]
-        except Exception as e:
-            return [
-                LintScoreIssue(r_file_path, linter_lang, linter_name, f"❌ Error: {e!s}")
-            ]
+        if self.cache:
+            self.cache.put(
+                {
+                    cache_keys[f]: issues
+                    for f, issues in fresh.items()
+                    if f in cache_keys
+                }
+            )
+
+        return [
+            issue
+            for r_file_path in files
+            for issue in cached.get(r_file_path) or fresh.get(r_file_path, [])
+        ]
+
+    def _lookup_cache(
+        self, cmd_base: tuple[str, ...], files: dict[str, str]
+    ) -> tuple[dict[str, list[LintScoreIssue]], dict[str, str]]:
+        if not self.cache:
+            return {}, {}
+
+        linter_name = _linter_name(cmd_base)
+        version = _linter_version(cmd_base)
+        config_hash = files_hash(linter_config_files.get(linter_name, []))
+
+        cached: dict[str, list[LintScoreIssue]] = {}
+        keys: dict[str, str] = {}
+
+        for r_file_path in files:
+            try:
+                content_hash = blob_hash(Path(r_file_path).read_bytes())
+            except OSError:
+                continue
+
+            key = LintCache.key(r_file_path, content_hash, version, config_hash)
+            keys[r_file_path] = key
+            issues = self.cache.get(key, r_file_path)
+            if issues is not None:
+                cached[r_file_path] = issues
+
+        return cached, keys
+
+
+LintRecord = tuple[str, int | None, int | None, str | None, str]
+
+
+def _parse_ruff(data: list[dict]) -> list[LintRecord]:
+    return [
+        (
+            item["filename"],
+            (item.get("location") or {}).get("row"),
+            (item.get("location") or {}).get("column"),
+            item.get("code"),
+            item.get("message", ""),
+        )
+        for item in data
+    ]
+
+
+def _parse_eslint(data: list[dict]) -> list[LintRecord]:
+    return [
+        (
+            result["filePath"],
+            message.get("line"),
+            message.get("column"),
+            message.get("ruleId"),
+            message.get("message", ""),
+        )
+        for result in data
+        for message in result.get("messages", [])
+    ]
+
+
+def _linter_name(cmd: tuple[str, ...]) -> str:
+    return cmd[1] if cmd[0] == "npx" else cmd[0]
+
+
+@cache
+def _linter_version(cmd: tuple[str, ...]) -> str:
+    linter_name = _linter_name(cmd)
+
+    # Avoid an `npx` cold start when eslint is installed locally.
+    package = Path("node_modules") / linter_name / "package.json"
+    if package.is_file():
+        try:
+            return json.loads(package.read_text(encoding="utf-8"))["version"]
+        except OSError, ValueError, KeyError:
+            pass
+
+    version_cmd = [*cmd[: cmd.index(linter_name) + 1], "--version"]
+    try:
+        result = subprocess.run(
+            version_cmd, capture_output=True, text=True, timeout=LINTER_TIMEOUT_SECONDS
+        )
+        return result.stdout.strip() or "unknown"
+    except FileNotFoundError, subprocess.TimeoutExpired:
+        return "unknown"
+
+
+def _issue_per_file(
+    files: dict[str, str], linter_name: str, message: str
+) -> list[LintScoreIssue]:
+    return [
+        LintScoreIssue(r_file_path, linter_lang, linter_name, message)
+        for r_file_path, linter_lang in files.items()
+    ]
 
 
 linter_commands = {
-    "python": ["ruff", "check"],
-    "javascript": ["npx", "eslint"],
-    "typescript": ["npx", "eslint"],
+    "python": ["ruff", "check", "--output-format", "json"],
+    "javascript": ["npx", "eslint", "-f", "json"],
+    "typescript": ["npx", "eslint", "-f", "json"],
+}
+
+linter_parsers = {"ruff": _parse_ruff, "eslint": _parse_eslint}
+
+linter_config_files = {
+    "ruff": ["pyproject.toml", "ruff.toml", ".ruff.toml"],
+    "eslint": [
+        ".eslintrc",
+        ".eslintrc.js",
+        ".eslintrc.cjs",
+        ".eslintrc.json",
+        ".eslintrc.yaml",
+        ".eslintrc.yml",
+        "eslint.config.js",
+        "eslint.config.mjs",
+        "eslint.config.cjs",
+        "eslint.config.ts",
+        "package.json",
+    ],
 }
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from git_agent.infra.lint_cache import default_cache_dir
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class LLMResponseCache:
+    """
+    Model responses in SQLite, keyed by everything that determines the output.
+    Entries expire after `max_age` seconds; past `max_bytes` the least recently used go first.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.path = path or default_cache_dir() / "llm.sqlite3"
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    @staticmethod
+    def key(model: str, digest: str, request_fingerprint: str) -> str:
+        """The fingerprint covers the system prompt, prompt, format schema and options."""
+        raw = "\0".join([model, digest, request_fingerprint])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        try:
+            with self._lock, self._db:
+                row = self._db.execute(
+                    "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                    (key, now - self.max_age),
+                ).fetchone()
+                if row:
+                    self._db.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+        except sqlite3.Error as e:
+            logger.debug(f"Could not read LLM cache: {e}")
+            return None
+
+        return row[0] if row else None
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        try:
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, response, len(response.encode("utf-8")), now, now),
+                )
+                self._evict(now)
+        except sqlite3.Error as e:
+            logger.debug(f"Could not write LLM cache: {e}")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _evict(self, now: float) -> None:
+        self._db.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.max_age,)
+        )
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", stale)
@@ -1,98 +1,351 @@
 from __future__ import annotations
 
-import requests
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+
+import httpx
 from loguru import logger
+from pydantic import BaseModel
+
+from git_agent.domain.models import CodeReviewResult, PromptEvalStats, ServerTiming
+from git_agent.domain.ports import AsyncLLMProvider, ItemCallback, server_timing
+from git_agent.infra.endpoint_pool import (
+    Endpoint,
+    EndpointPool,
+    model_key,
+    request_error,
+)
+from git_agent.infra.http_client import HostClient, async_client
+from git_agent.infra.json_stream import IncrementalJSONScanner, is_complete_json
+from git_agent.infra.llm_cache import LLMResponseCache
+from git_agent.infra.prompt_eval_store import PromptEvalBaselines
+
+DEFAULT_NUM_CTX = 16_384
+DEFAULT_NUM_PREDICT = 4096
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Computed once per process; it is identical for every request.
+REVIEW_SCHEMA = CodeReviewResult.model_json_schema()
+
+
+class GenerateResponse(BaseModel):
+    """
+    An `/api/generate` reply or stream chunk. Validating the body bytes directly skips
+    building a dict of the envelope just to read one string out of it.
+    """
+
+    response: str = ""
+    done: bool = False
+    prompt_eval_count: int = 0
+    # Nanoseconds, only in the final chunk.
+    prompt_eval_duration: int = 0
+    load_duration: int = 0
+    eval_duration: int = 0
 
-from git_agent.domain.models import CodeReviewResult
-from git_agent.domain.ports import LLMProvider
 
+@dataclass(frozen=True)
+class PreparedRequest:
+    """
+    A `/api/generate` body encoded once as UTF-8 JSON, without the model name.
+    Sharing it across models avoids re-serializing a large prompt for every request.
+    """
+
+    body_tail: bytes
+    stream: bool = False
+    # Hash of everything but the model and the stream flag, which do not change the answer.
+    fingerprint: str = ""
+    # System prompt and prompt, estimated; only informational.
+    estimated_tokens: int = 0
+    # Same as `fingerprint` without the user's note, to compare prompt evaluation
+    # with earlier runs that used another note.
+    stable_fingerprint: str = ""
+
+    def body_for(self, model: str, keep_alive: str | None = None) -> bytes:
+        head = b'{"model":' + json.dumps(model).encode("utf-8") + b","
+        if keep_alive is not None:
+            head += b'"keep_alive":' + json.dumps(keep_alive).encode("utf-8") + b","
+        return head + self.body_tail
+
+
+def prepare(
+    prompt: str,
+    system: str | None = None,
+    temperature: float = 0.2,
+    max_tokens: int = DEFAULT_NUM_PREDICT,
+    num_ctx: int = DEFAULT_NUM_CTX,
+    stream: bool = False,
+) -> PreparedRequest:
+    """Builds an `/api/generate` body once, to be sent for any number of models."""
+    payload = {
+        "prompt": prompt,
+        "system": system,
+        "format": REVIEW_SCHEMA,
+        "think": False,
+        "options": {
+            "temperature": temperature,
+            "num_ctx": num_ctx,
+            "num_predict": max_tokens,
+            "repeat_penalty": 1.1,
+        },
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    fingerprint = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    # Drop the closing brace to append the stream flag, and the opening one;
+    # body_for() prepends it together with the model.
+    body = body[:-1] + f',"stream":{json.dumps(stream)}}}'
+    return PreparedRequest(
+        body_tail=body[1:].encode("utf-8"), stream=stream, fingerprint=fingerprint
+    )
+
+
+class AsyncOllamaLLMProvider(AsyncLLMProvider[Endpoint, PreparedRequest]):
+    """
+    `/api/generate` over `httpx.AsyncClient`s, so many requests can be in flight on
+    one event loop. Given a pool, each request can go to a different Ollama host.
+    """
 
-class OllamaLLMProvider(LLMProvider):
     def __init__(
-        self, host: str = "http://localhost:11434", model: str = "qwen2.5-coder:7b"
+        self,
+        host: str = "http://localhost:11434",
+        model: str = "qwen2.5-coder:7b",
+        num_ctx: int = DEFAULT_NUM_CTX,
+        client: HostClient | None = None,
+        cache: LLMResponseCache | None = None,
+        pool: EndpointPool | None = None,
+        keep_alive: str | None = None,
+        baselines: PromptEvalBaselines | None = None,
     ):
-        self.host = host.rstrip("/")
+        self.pool = pool or EndpointPool(
+            [Endpoint(host.rstrip("/"), client or async_client(host))]
+        )
         self.model = model
+        self.num_ctx = num_ctx
+        self.cache = cache
+        # How long Ollama keeps the model, and with it the prompt's KV cache, loaded.
+        self.keep_alive = keep_alive
+        self.prompt_eval = PromptEvalStats()
+        # Earlier `prompt_eval_count`s, to measure what Ollama's KV cache saved.
+        self.baselines = baselines
+        self._digest: str | None = None
 
-    def generate(
+    async def generate(
         self,
         prompt: str,
         system: str | None = None,
         temperature: float = 0.2,
-        max_tokens: int = 4096,
+        max_tokens: int = DEFAULT_NUM_PREDICT,
     ) -> str:
-        url = f"{self.host}/api/generate"
+        prepared = prepare(
+            prompt, system, temperature, max_tokens, num_ctx=self.num_ctx
+        )
+        async with self.pool.lease(self.model) as endpoint:
+            return await self.generate_prepared(prepared, endpoint=endpoint)
 
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "system": system,
-            "stream": False,
-            "format": CodeReviewResult.model_json_schema(),
-            "think": False,
-            "options": {
-                "temperature": temperature,
-                "num_ctx": 16_384,
-                "num_predict": max_tokens,
-                "repeat_penalty": 1.1,
-            },
-        }
+    async def generate_prepared(
+        self,
+        prepared: PreparedRequest,
+        on_item: ItemCallback | None = None,
+        endpoint: Endpoint | None = None,
+    ) -> str:
+        """Sends the request to `endpoint`, or to the pool's first host."""
+        endpoint = endpoint or self.pool.endpoints[0]
+        r_json = await self._generate(prepared, on_item, endpoint)
+
+        # Truncated or malformed output is not worth serving again.
+        key = await self._cache_key(prepared, endpoint)
+        if key and is_complete_json(r_json):
+            self.cache.put(key, r_json)
+        return r_json
+
+    async def cached(self, prepared: PreparedRequest) -> str | None:
+        key = await self._cache_key(prepared)
+        if not key:
+            return None
+        hit = self.cache.get(key)
+        if hit is not None:
+            logger.debug(f"LLM cache hit for {self.model}")
+        return hit
+
+    async def model_digest(self, endpoint: Endpoint | None = None) -> str:
+        if self._digest is None:
+            client = (endpoint or self.pool.endpoints[0]).client
+            try:
+                response = await client.get("/api/tags", timeout=5)
+                response.raise_for_status()
+                self._digest = _find_digest(response.json(), self.model)
+            except httpx.HTTPError, ValueError:
+                return ""
+        return self._digest
 
+    async def _cache_key(
+        self, prepared: PreparedRequest, endpoint: Endpoint | None = None
+    ) -> str | None:
+        if not self.cache:
+            return None
+        return LLMResponseCache.key(
+            self.model, await self.model_digest(endpoint), prepared.fingerprint
+        )
+
+    async def _generate(
+        self,
+        prepared: PreparedRequest,
+        on_item: ItemCallback | None,
+        endpoint: Endpoint,
+    ) -> str:
+        client = endpoint.client
+        started = time.monotonic()
         try:
-            response = requests.post(url, json=payload)
+            if prepared.stream:
+                return await self._generate_stream(prepared, on_item, client, started)
+
+            response = await client.post(
+                "/api/generate",
+                content=prepared.body_for(self.model, self.keep_alive),
+                headers=JSON_HEADERS,
+            )
             response.raise_for_status()
-            result = response.json()
-            r_json = result.get("response", "{}")
-
-            logger.debug(r_json)
-            return r_json
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network failure with Ollama: {e}")
-            raise ConnectionError(f"Error connecting to Ollama: {e}") from None
+            result = GenerateResponse.model_validate_json(response.content)
+            self._record_prompt_eval(prepared, result)
+            _record_timing(started, result)
+
+            logger.debug(result.response)
+            return result.response or "{}"
+        except httpx.HTTPError as e:
+            logger.error(f"Request to Ollama at {endpoint.host} failed: {e}")
+            raise request_error(endpoint.host, e) from None
         except (ValueError, KeyError) as e:
             logger.error(f"Invalid response from Ollama: {e}")
             raise ValueError(f"Error processing response: {e}") from e
 
-    def chat(
+    async def _generate_stream(
         self,
-        messages: list[dict[str, str]],
-        temperature: float = 0.2,
-        max_tokens: int = 4096
+        prepared: PreparedRequest,
+        on_item: ItemCallback | None,
+        client: httpx.AsyncClient,
+        started: float,
     ) -> str:
-        url = f"{self.host}/api/chat"
+        scanner = IncrementalJSONScanner(on_item)
 
+        async with client.stream(
+            "POST",
+            "/api/generate",
+            content=prepared.body_for(self.model, self.keep_alive),
+            headers=JSON_HEADERS,
+        ) as response:
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = GenerateResponse.model_validate_json(line)
+                if scanner.feed(chunk.response):
+                    # Leaving the block closes the connection, which stops generation.
+                    # The counters only come with the final chunk, so none are recorded.
+                    logger.debug("Review JSON complete, stopping generation early")
+                    break
+                if chunk.done:
+                    self._record_prompt_eval(prepared, chunk)
+                    _record_timing(started, chunk)
+                    break
+
+        r_json = scanner.text or "{}"
+        logger.debug(r_json)
+        return r_json
+
+    async def chat(
+        self,
+        messages: list[dict[str, str]],
+        schema: dict | None = None,
+        max_tokens: int = DEFAULT_NUM_PREDICT,
+        endpoint: Endpoint | None = None,
+    ) -> str:
+        """`/api/chat` with the review's num_ctx, so the model is not reloaded."""
+        endpoint = endpoint or self.pool.endpoints[0]
         payload = {
             "model": self.model,
             "messages": messages,
             "stream": False,
-            "options": {"temperature": temperature, "num_predict": max_tokens},
+            "think": False,
+            "options": {
+                "temperature": 0.2,
+                "num_ctx": self.num_ctx,
+                "num_predict": max_tokens,
+            },
         }
+        if schema is not None:
+            payload["format"] = schema
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
 
         try:
-            response = requests.post(url, json=payload, timeout=120)
+            response = await endpoint.client.post("/api/chat", json=payload)
             response.raise_for_status()
-            result = response.json()
-            return result.get("message", {}).get("content", "")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network failure with Ollama: {e}")
-            raise ConnectionError(f"Error connecting to Ollama: {e}") from None
+            return response.json()["message"]["content"]
+        except httpx.HTTPError as e:
+            logger.error(f"Request to Ollama at {endpoint.host} failed: {e}")
+            raise request_error(endpoint.host, e) from None
         except (ValueError, KeyError) as e:
             logger.error(f"Invalid response from Ollama: {e}")
             raise ValueError(f"Error processing response: {e}") from e
 
-    def is_available(self) -> bool:
-        try:
-            response = requests.get(f"{self.host}/api/tags", timeout=5)
-            return response.status_code == 200
-        except Exception:
-            return False
+    def _record_prompt_eval(
+        self, prepared: PreparedRequest, result: GenerateResponse
+    ) -> None:
+        if not result.done:
+            return
+        baselines = self.baselines if prepared.stable_fingerprint else None
+        key = (
+            baselines.key(self.model, prepared.stable_fingerprint) if baselines else ""
+        )
+        # Ollama leaves the count out when the whole prompt was cached. The largest
+        # count seen for a prompt is the closest to a full evaluation of it.
+        baseline = baselines.get(key) if baselines else None
+        self.prompt_eval.record(
+            result.prompt_eval_count, result.prompt_eval_duration / 1e9, baseline
+        )
+        if baselines:
+            baselines.put(key, result.prompt_eval_count)
+
+    async def release(self) -> None:
+        """Unloads the model from every host holding it, instead of when its keep-alive expires."""
+        key = model_key(self.model)
+        for endpoint in self.pool.endpoints:
+            if key not in endpoint.loaded:
+                continue
+            try:
+                response = await endpoint.client.post(
+                    "/api/generate", json={"model": self.model, "keep_alive": 0}
+                )
+                response.raise_for_status()
+                endpoint.loaded.pop(key, None)
+                logger.debug(f"Released {self.model} on {endpoint.host}")
+            except httpx.HTTPError as e:
+                logger.debug(f"Could not release {self.model} on {endpoint.host}: {e}")
+
+    async def is_available(self) -> bool:
+        checks = [e.client.is_available("/api/tags") for e in self.pool.endpoints]
+        return any(await asyncio.gather(*checks))
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+
+def _record_timing(started: float, result: GenerateResponse) -> None:
+    # Ollama queues requests beyond OLLAMA_NUM_PARALLEL instead of refusing them. The
+    # time it did not spend loading or evaluating is the wait for a free slot.
+    busy = (
+        result.load_duration + result.prompt_eval_duration + result.eval_duration
+    ) / 1e9
+    if busy > 0:
+        queued = max(0.0, time.monotonic() - started - busy)
+        server_timing.set(ServerTiming(queued, busy))
 
-    def list_models(self) -> list[str]:
-        try:
-            response = requests.get(f"{self.host}/api/tags", timeout=5)
-            response.raise_for_status()
 
-            data = response.json()
-            return [model["name"] for model in data.get("models", [])]
-        except Exception:
-            return []
+def _find_digest(tags: dict, model: str) -> str:
+    for entry in tags.get("models", []):
+        if model_key(entry.get("name", "")) == model_key(model):
+            return entry.get("digest", "")
+    return ""
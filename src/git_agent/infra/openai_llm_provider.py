@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+
+import httpx
+from loguru import logger
+
+from git_agent.domain.ports import AsyncLLMProvider, ItemCallback
+from git_agent.infra.endpoint_pool import (
+    Endpoint,
+    EndpointPool,
+    model_key,
+    request_error,
+)
+from git_agent.infra.http_client import HostClient, async_client
+from git_agent.infra.json_stream import IncrementalJSONScanner, is_complete_json
+from git_agent.infra.llm_cache import LLMResponseCache
+from git_agent.infra.ollama_llm_provider import (
+    DEFAULT_NUM_CTX,
+    DEFAULT_NUM_PREDICT,
+    JSON_HEADERS,
+    REVIEW_SCHEMA,
+    PreparedRequest,
+)
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "code_review", "schema": REVIEW_SCHEMA},
+}
+
+
+def auth_headers() -> dict[str, str]:
+    """Local servers usually run without a key; vLLM and LM Studio can require one."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    return {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+
+async def inspect_openai(
+    client: httpx.AsyncClient,
+) -> tuple[dict[str, int], dict[str, int]]:
+    response = await client.get("/v1/models", timeout=5)
+    response.raise_for_status()
+    # These servers keep every model they list in memory.
+    served = {model_key(entry["id"]): 0 for entry in response.json().get("data", [])}
+    return served, dict(served)
+
+
+class AsyncOpenAILLMProvider(AsyncLLMProvider[Endpoint, PreparedRequest]):
+    """
+    `/v1/chat/completions` on OpenAI-compatible servers such as llama.cpp, vLLM or
+    LM Studio. Their continuous batching serves concurrent requests together; with
+    `batch_prompts`, all shards of a model also go to one host at once, as a `PromptBatcher`.
+    """
+
+    def __init__(
+        self,
+        host: str = "http://localhost:8000",
+        model: str = "default",
+        client: HostClient | None = None,
+        cache: LLMResponseCache | None = None,
+        pool: EndpointPool | None = None,
+        batch_prompts: bool = False,
+    ):
+        self.pool = pool or EndpointPool(
+            [
+                Endpoint(
+                    host.rstrip("/"),
+                    client or async_client(host, headers=auth_headers()),
+                )
+            ],
+            inspect=inspect_openai,
+        )
+        self.model = model
+        self.cache = cache
+        self.batch_prompts = batch_prompts
+
+    @staticmethod
+    def prepare(
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = DEFAULT_NUM_PREDICT,
+        num_ctx: int = DEFAULT_NUM_CTX,
+        stream: bool = False,
+    ) -> PreparedRequest:
+        """Same contract as `ollama_llm_provider.prepare`; the context size is fixed server-side."""
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+
+        payload = {
+            "messages": messages,
+            "response_format": RESPONSE_FORMAT,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        fingerprint = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        body = body[:-1] + f',"stream":{json.dumps(stream)}}}'
+        return PreparedRequest(
+            body_tail=body[1:].encode("utf-8"), stream=stream, fingerprint=fingerprint
+        )
+
+    async def generate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = DEFAULT_NUM_PREDICT,
+    ) -> str:
+        prepared = self.prepare(prompt, system, temperature, max_tokens)
+        async with self.pool.lease(self.model) as endpoint:
+            return await self.generate_prepared(prepared, endpoint=endpoint)
+
+    async def generate_prepared(
+        self,
+        prepared: PreparedRequest,
+        on_item: ItemCallback | None = None,
+        endpoint: Endpoint | None = None,
+    ) -> str:
+        endpoint = endpoint or self.pool.endpoints[0]
+        key = self._cache_key(prepared)
+        try:
+            if prepared.stream:
+                r_json = await self._generate_stream(prepared, on_item, endpoint.client)
+            else:
+                response = await endpoint.client.post(
+                    "/v1/chat/completions",
+                    content=prepared.body_for(self.model),
+                    headers=JSON_HEADERS,
+                )
+                response.raise_for_status()
+                r_json = response.json()["choices"][0]["message"]["content"] or "{}"
+        except httpx.HTTPError as e:
+            logger.error(f"Request to {endpoint.host} failed: {e}")
+            raise request_error(endpoint.host, e) from None
+        except (ValueError, KeyError, IndexError) as e:
+            logger.error(f"Invalid response from {endpoint.host}: {e}")
+            raise ValueError(f"Error processing response: {e}") from e
+
+        logger.debug(r_json)
+        if key and is_complete_json(r_json):
+            self.cache.put(key, r_json)
+        return r_json
+
+    async def generate_batch(
+        self, requests: list[PreparedRequest], endpoint: Endpoint | None = None
+    ) -> list[str]:
+        """
+        Answers several prepared chat requests together on one host. There is no batched
+        chat endpoint, so the requests go out at once and the server's continuous batching
+        runs them as one batch, each with the model's chat template. Cached answers are
+        not sent again.
+        """
+        endpoint = endpoint or self.pool.endpoints[0]
+        hits = [await self.cached(request) for request in requests]
+        answers = iter(
+            await asyncio.gather(
+                *(
+                    self.generate_prepared(request, endpoint=endpoint)
+                    for request, hit in zip(requests, hits, strict=True)
+                    if hit is None
+                )
+            )
+        )
+        return [hit if hit is not None else next(answers) for hit in hits]
+
+    async def chat(
+        self,
+        messages: list[dict[str, str]],
+        schema: dict | None = None,
+        max_tokens: int = DEFAULT_NUM_PREDICT,
+        endpoint: Endpoint | None = None,
+    ) -> str:
+        endpoint = endpoint or self.pool.endpoints[0]
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.2,
+            "max_tokens": max_tokens,
+        }
+        if schema is not None:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "review_fields", "schema": schema},
+            }
+
+        try:
+            response = await endpoint.client.post("/v1/chat/completions", json=payload)
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"] or ""
+        except httpx.HTTPError as e:
+            logger.error(f"Request to {endpoint.host} failed: {e}")
+            raise request_error(endpoint.host, e) from None
+        except (ValueError, KeyError, IndexError) as e:
+            logger.error(f"Invalid response from {endpoint.host}: {e}")
+            raise ValueError(f"Error processing response: {e}") from e
+
+    async def _generate_stream(
+        self,
+        prepared: PreparedRequest,
+        on_item: ItemCallback | None,
+        client: httpx.AsyncClient,
+    ) -> str:
+        scanner = IncrementalJSONScanner(on_item)
+
+        async with client.stream(
+            "POST",
+            "/v1/chat/completions",
+            content=prepared.body_for(self.model),
+            headers=JSON_HEADERS,
+        ) as response:
+            response.raise_for_status()
+
+            # Server-sent events: "data: {...}" lines ending with "data: [DONE]".
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content") or ""
+                if scanner.feed(delta):
+                    logger.debug("Review JSON complete, stopping generation early")
+                    break
+
+        return scanner.text or "{}"
+
+    async def cached(self, prepared: PreparedRequest) -> str | None:
+        key = self._cache_key(prepared)
+        if not key:
+            return None
+        hit = self.cache.get(key)
+        if hit is not None:
+            logger.debug(f"LLM cache hit for {self.model}")
+        return hit
+
+    def _cache_key(self, prepared: PreparedRequest) -> str | None:
+        if not self.cache:
+            return None
+        # These servers expose no model digest; the served name stands in for it.
+        return LLMResponseCache.key(self.model, "", prepared.fingerprint)
+
+    async def release(self) -> None:
+        """Models stay resident for the server's lifetime."""
+
+    async def is_available(self) -> bool:
+        checks = [e.client.is_available("/v1/models") for e in self.pool.endpoints]
+        return any(await asyncio.gather(*checks))
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from loguru import logger
+
+from git_agent.infra.lint_cache import default_cache_dir
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class PromptEvalBaselines:
+    """
+    The largest `prompt_eval_count` seen for each model and prompt without the user's
+    note, kept across runs. A later run with another note, whose prefix Ollama still has
+    cached, evaluates fewer tokens; the difference is what the cache saved.
+    """
+
+    def __init__(
+        self, path: Path | None = None, max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.path = path or default_cache_dir() / "prompt_eval.json"
+        self.max_entries = max_entries
+        self._counts: dict[str, int] | None = None
+
+    @staticmethod
+    def key(model: str, stable_fingerprint: str) -> str:
+        return hashlib.sha256(f"{model}\0{stable_fingerprint}".encode()).hexdigest()
+
+    def get(self, key: str) -> int | None:
+        return self._load().get(key)
+
+    def put(self, key: str, count: int) -> None:
+        counts = self._load()
+        if counts.get(key, -1) >= count:
+            return
+        # Most recently raised last, so the oldest entries go first.
+        counts.pop(key, None)
+        counts[key] = count
+        while len(counts) > self.max_entries:
+            del counts[next(iter(counts))]
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(counts))
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.debug(f"Could not save prompt eval baselines: {e}")
+
+    def _load(self) -> dict[str, int]:
+        if self._counts is None:
+            try:
+                data = json.loads(self.path.read_text())
+                self._counts = data if isinstance(data, dict) else {}
+            except OSError, ValueError:
+                self._counts = {}
+        return self._counts
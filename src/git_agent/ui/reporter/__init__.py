@@ -13,8 +13,17 @@ class TerminalReporter:
     def render_review(self, *args, **kwargs):
         self.reviewer.render_review(*args, **kwargs)
 
+    def render_streamed_issue(self, *args, **kwargs):
+        self.reviewer.render_streamed_issue(*args, **kwargs)
+
     def render_model_header(self, *args, **kwargs):
         self.reviewer.render_model_header(*args, **kwargs)
 
     def render_multi(self, *args, **kwargs):
         self.comparator.render_multi(*args, **kwargs)
+
+    def render_cascade(self, *args, **kwargs):
+        self.reviewer.render_cascade(*args, **kwargs)
+
+    def render_answer(self, *args, **kwargs):
+        self.reviewer.render_answer(*args, **kwargs)
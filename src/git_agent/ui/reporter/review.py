@@ -6,6 +6,7 @@ from rich.syntax import Syntax
 from rich.table import Table
 from rich.text import Text
 
+from git_agent.application.cascade import CascadeDecision, CascadeResult
 from git_agent.domain.models import (
     ApprovalStatus,
     CodeIssue,
@@ -129,6 +130,15 @@ class ReviewReporter:
             )
         return items
 
+    def render_streamed_issue(self, model: str, issue: CodeIssue):
+        color = COLOR_ERROR if issue.severity.value == "critical" else COLOR_WARNING
+        self.console.print(
+            Text(
+                f"[{model}] {issue.severity.value.upper()} {issue.file}:{issue.line} - {issue.description}",
+                style=color,
+            )
+        )
+
     def render_model_header(
         self,
         model: str,
@@ -149,3 +159,45 @@ class ReviewReporter:
         if status is not None:
             body += f"\nStatus: [bold]{status.value}[/]"
         self.console.print(Panel(body, title="Model", border_style=border))
+
+    def render_cascade(self, outcome: CascadeResult):
+        decision_colors = {
+            CascadeDecision.Accepted: COLOR_SUCCESS,
+            CascadeDecision.Escalated: COLOR_WARNING,
+            CascadeDecision.Final: COLOR_PRIMARY,
+            CascadeDecision.Failed: COLOR_ERROR,
+            CascadeDecision.Skipped: COLOR_DIM,
+        }
+        table = Table(
+            title="Cascade",
+            show_header=True,
+            header_style=f"bold {COLOR_PRIMARY}",
+            expand=True,
+        )
+        table.add_column("Model", width=25)
+        table.add_column("Decision", width=12)
+        table.add_column("Reason")
+        table.add_column("Time", justify="right", width=10)
+
+        for step in outcome.steps:
+            ran = step.decision != CascadeDecision.Skipped
+            table.add_row(
+                step.model,
+                Text(step.decision.value, style=decision_colors[step.decision]),
+                step.reason,
+                f"{step.duration_seconds:.2f}s" if ran else "-",
+            )
+
+        self.console.print(table)
+        if outcome.estimated_seconds_saved:
+            self.console.print(
+                Text(
+                    f"Skipped models would have taken ~{outcome.estimated_seconds_saved:.1f}s",
+                    style=COLOR_DIM,
+                )
+            )
+
+    def render_answer(self, model: str, answer: str):
+        self.console.print(
+            Panel(Markdown(answer), title=model, border_style=COLOR_PRIMARY)
+        )
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from git_agent.application.cascade import CascadeDecision, ReviewCascade
+from git_agent.application.orchestrator import ModelRunResult
+from git_agent.config import parse_args
+from git_agent.domain.models import (
+    ApprovalStatus,
+    CodeReviewResult,
+    LintScore,
+    ReviewContext,
+)
+
+CONTEXT = ReviewContext(
+    diff="",
+    files_changed=[],
+    file_contents={},
+    linter_results=LintScore(issues=[], by_language={}, linters_used=set()),
+)
+
+
+class StubOrchestrator:
+    """Answers each model with a fixed approval status."""
+
+    def __init__(self, statuses: dict[str, ApprovalStatus]):
+        self.statuses = statuses
+        self.ran: list[str] = []
+
+    async def run(self, models: list[str], shards: list) -> list[ModelRunResult]:
+        [model] = models
+        self.ran.append(model)
+        review = CodeReviewResult(
+            summary=model,
+            commit_proposals=[],
+            approval_status=self.statuses[model],
+            files_reviewed=1,
+            languages_detected=[],
+        )
+        return [ModelRunResult(model, review, 1.0)]
+
+
+def run_cascade(statuses: dict[str, ApprovalStatus]):
+    orchestrator = StubOrchestrator(statuses)
+    cascade = ReviewCascade(orchestrator)
+    return asyncio.run(cascade.run(list(statuses), [], CONTEXT)), orchestrator
+
+
+def test_stops_at_first_approval():
+    outcome, orchestrator = run_cascade(
+        {"small": ApprovalStatus.Approved, "large": ApprovalStatus.Rejected}
+    )
+
+    assert orchestrator.ran == ["small"]
+    assert [s.decision for s in outcome.steps] == [
+        CascadeDecision.Accepted,
+        CascadeDecision.Skipped,
+    ]
+    assert outcome.result.review.summary == "small"
+
+
+def test_ending_in_rejection_is_final_not_accepted():
+    outcome, orchestrator = run_cascade(
+        {"small": ApprovalStatus.NeedsFixes, "large": ApprovalStatus.Rejected}
+    )
+
+    assert orchestrator.ran == ["small", "large"]
+    escalated, last = outcome.steps
+    assert escalated.decision == CascadeDecision.Escalated
+    assert last.decision == CascadeDecision.Final
+    assert last.status == ApprovalStatus.Rejected
+    assert last.reason == "rejected"
+    assert outcome.result.review.approval_status == ApprovalStatus.Rejected
+
+
+def test_cascade_rejects_quorum():
+    with pytest.raises(SystemExit):
+        parse_args(["--cascade", "--quorum", "1", "--models", "a,b"])
@@ -0,0 +1,51 @@
+from git_agent.application.context_window import line_marks, merge_ranges
+from git_agent.domain.models import FileDiff
+
+HEADER = "diff --git a/f.py b/f.py\n--- a/f.py\n+++ b/f.py\n"
+
+
+def marks_for(*hunks: str):
+    return line_marks(FileDiff("f.py", HEADER + "".join(hunks)))
+
+
+def test_replacement_marks_added_and_removed_lines():
+    marks = marks_for("@@ -5,2 +5,1 @@\n-a\n-b\n+c\n")
+    assert marks.added == {5}
+    assert marks.removed == {5: ["a", "b"]}
+
+
+def test_pure_addition():
+    marks = marks_for("@@ -7,0 +8,2 @@\n+p\n+q\n")
+    assert marks.added == {8, 9}
+    assert marks.removed == {}
+
+
+def test_pure_deletion_precedes_the_next_line():
+    # Lines 3-4 of the old file are gone; old line 5 is now line 3.
+    marks = marks_for("@@ -3,2 +2,0 @@\n-x\n-y\n")
+    assert marks.added == set()
+    assert marks.removed == {3: ["x", "y"]}
+
+
+def test_deletion_at_top_of_file():
+    marks = marks_for("@@ -1,2 +0,0 @@\n-first\n-second\n")
+    assert marks.removed == {1: ["first", "second"]}
+
+
+def test_several_hunks_and_context_lines():
+    marks = marks_for(
+        "@@ -2,3 +2,3 @@\n keep\n-old\n+new\n keep\n",
+        "@@ -20 +20,2 @@\n-was\n+is\n+also\n",
+    )
+    assert marks.added == {3, 20, 21}
+    assert marks.removed == {3: ["old"], 20: ["was"]}
+
+
+def test_file_headers_and_no_newline_markers_are_ignored():
+    marks = marks_for("@@ -1 +1 @@\n-a\n\\ No newline at end of file\n+b\n")
+    assert marks.added == {1}
+    assert marks.removed == {1: ["a"]}
+
+
+def test_merge_ranges_joins_overlapping_and_adjacent():
+    assert merge_ranges([(10, 12), (1, 3), (4, 5), (11, 20)]) == [(1, 5), (10, 20)]
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from git_agent.application.orchestrator import ReviewOrchestrator
+from git_agent.infra.endpoint_pool import EndpointPool, LLMResponseError, model_key
+from git_agent.infra.ollama_llm_provider import AsyncOllamaLLMProvider, prepare
+
+MODEL = "tiny"
+REVIEW = '{"approval_status": "APPROVED", "summary": "ok", "issues": []}'
+
+
+class StandInOllama(ThreadingHTTPServer):
+    """Answers `/api/generate` with `status`, and counts the requests it gets."""
+
+    daemon_threads = True
+
+    def __init__(self, status: int = 200):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.status = status
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInOllama
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests += 1
+        if self.server.status == 200:
+            body = json.dumps({"response": REVIEW, "done": True}).encode()
+        else:
+            body = json.dumps({"error": "stand-in failure"}).encode()
+
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        body = json.dumps({"models": [{"name": f"{MODEL}:latest"}]}).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+
+@pytest.fixture
+def serve() -> Iterator:
+    servers: list[StandInOllama] = []
+
+    def start(status: int = 200) -> StandInOllama:
+        server = StandInOllama(status)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def provider_for(hosts: list[str], cooldown: float = 30.0) -> AsyncOllamaLLMProvider:
+    pool = EndpointPool.connect(
+        hosts, connect_timeout=1, read_timeout=5, cooldown=cooldown
+    )
+    return AsyncOllamaLLMProvider(model=MODEL, pool=pool)
+
+
+async def generate(provider: AsyncOllamaLLMProvider) -> str:
+    async with provider.pool.lease(MODEL) as endpoint:
+        return await provider.generate_prepared(
+            prepare("review this"), endpoint=endpoint
+        )
+
+
+def test_unreachable_host_is_marked_down():
+    async def scenario() -> None:
+        provider = provider_for([closed_port_url()])
+        try:
+            with pytest.raises(ConnectionError):
+                await generate(provider)
+            assert not provider.pool.endpoints[0].healthy
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_503_marks_host_down(serve):
+    server = serve(503)
+
+    async def scenario() -> None:
+        provider = provider_for([server.url])
+        try:
+            with pytest.raises(ConnectionError):
+                await generate(provider)
+            assert provider.pool.healthy_hosts() == []
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("status", [404, 500])
+def test_other_error_status_keeps_host_in_rotation(serve, status):
+    server = serve(status)
+
+    async def scenario() -> None:
+        provider = provider_for([server.url])
+        endpoint = provider.pool.endpoints[0]
+        endpoint.loaded[model_key("other")] = 1
+        try:
+            with pytest.raises(LLMResponseError) as error:
+                await generate(provider)
+            assert error.value.status_code == status
+            assert endpoint.healthy
+            assert model_key("other") in endpoint.loaded
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_failover_moves_to_healthy_host(serve):
+    server = serve()
+
+    async def scenario() -> None:
+        provider = provider_for([closed_port_url(), server.url])
+        dead, alive = provider.pool.endpoints
+        # Make the dead host the first choice.
+        alive.assigned = 1
+        agent = SimpleNamespace(model=MODEL, pool=provider.pool)
+        prepared = prepare("review this")
+        try:
+            answer = await ReviewOrchestrator(lambda _: agent)._on_endpoint(
+                agent,
+                lambda endpoint: provider.generate_prepared(
+                    prepared, endpoint=endpoint
+                ),
+            )
+            assert answer == REVIEW
+            assert not dead.healthy
+            assert server.requests == 1
+            assert model_key(MODEL) in alive.loaded
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_failover_gives_up_when_every_host_fails():
+    async def scenario() -> None:
+        provider = provider_for([closed_port_url(), closed_port_url()])
+        agent = SimpleNamespace(model=MODEL, pool=provider.pool)
+        prepared = prepare("review this")
+        try:
+            with pytest.raises(ConnectionError):
+                await ReviewOrchestrator(lambda _: agent)._on_endpoint(
+                    agent,
+                    lambda endpoint: provider.generate_prepared(
+                        prepared, endpoint=endpoint
+                    ),
+                )
+            assert provider.pool.healthy_hosts() == []
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_host_returns_after_cooldown(serve):
+    server = serve(503)
+
+    async def scenario() -> None:
+        provider = provider_for([server.url], cooldown=0.2)
+        try:
+            with pytest.raises(ConnectionError):
+                await generate(provider)
+            assert provider.pool.healthy_hosts() == []
+
+            server.status = 200
+            time.sleep(0.25)
+            assert provider.pool.healthy_hosts() == [server.url]
+            assert await generate(provider) == REVIEW
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_down_host_is_skipped_during_cooldown(serve):
+    flaky, steady = serve(503), serve()
+
+    async def scenario() -> None:
+        provider = provider_for([flaky.url, steady.url])
+        try:
+            with pytest.raises(ConnectionError):
+                await generate(provider)
+            flaky.status = 200
+            for _ in range(3):
+                assert await generate(provider) == REVIEW
+            assert flaky.requests == 1
+            assert steady.requests == 3
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_availability_is_probed_once_per_host(serve):
+    server = serve()
+
+    async def scenario() -> None:
+        provider = provider_for([server.url, closed_port_url()])
+        try:
+            checks = [provider.is_available() for _ in range(3)]
+            assert await asyncio.gather(*checks) == [True] * 3
+            assert server.requests == 1
+        finally:
+            await provider.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,124 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from git_agent.application.followup import FollowUpSession
+from git_agent.application.ollama_agent import PreparedReview
+from git_agent.application.sharding import PreparedShard
+from git_agent.domain.models import (
+    ApprovalStatus,
+    CodeReviewResult,
+    LintScore,
+    ReviewContext,
+)
+from git_agent.infra.ollama_llm_provider import prepare
+
+REVIEW = CodeReviewResult(
+    summary="merged review",
+    commit_proposals=[],
+    approval_status=ApprovalStatus.NeedsFixes,
+    files_reviewed=2,
+    languages_detected=["python"],
+)
+
+
+@dataclass
+class StubEndpoint:
+    host: str
+    healthy: bool = True
+
+
+class StubPool:
+    def __init__(self, *endpoints: StubEndpoint):
+        self.endpoints = list(endpoints)
+        self.leased: list[str] = []
+
+    @asynccontextmanager
+    async def lease(self, model: str):
+        endpoint = self.endpoints[0]
+        self.leased.append(endpoint.host)
+        yield endpoint
+
+    def mark_down(self, endpoint: StubEndpoint) -> None:
+        endpoint.healthy = False
+
+
+class StubProvider:
+    """Records where each chat went and what it carried."""
+
+    def __init__(self, pool: StubPool):
+        self.pool = pool
+        self.calls: list[tuple[str, list[dict[str, str]]]] = []
+
+    async def chat(self, messages, endpoint=None) -> str:
+        self.calls.append((endpoint.host, list(messages)))
+        return "answer"
+
+
+def shard(path: str) -> PreparedShard:
+    context = ReviewContext(
+        diff="",
+        files_changed=[path],
+        file_contents={},
+        linter_results=LintScore(issues=[], by_language={}, linters_used=set()),
+    )
+    prompt = f"prompt for {path}"
+    review = PreparedReview(
+        request=prepare(prompt, system="review"),
+        estimated_tokens=0,
+        build_seconds=0.0,
+        prompt=prompt,
+        system="review",
+    )
+    return PreparedShard(context, review)
+
+
+def session(pool: StubPool) -> tuple[FollowUpSession, StubProvider]:
+    provider = StubProvider(pool)
+    shards = [shard("a.py"), shard("b.py")]
+    followup = FollowUpSession(
+        provider, "tiny", shards, REVIEW, hosts=("http://one", "http://two")
+    )
+    return followup, provider
+
+
+def test_question_goes_to_the_host_that_reviewed_its_shard():
+    pool = StubPool(StubEndpoint("http://one"), StubEndpoint("http://two"))
+    followup, provider = session(pool)
+
+    asyncio.run(followup.ask("why is b.py:3 a bug?"))
+
+    [(host, messages)] = provider.calls
+    assert host == "http://two"
+    assert pool.leased == []
+    contents = [m["content"] for m in messages]
+    assert contents[:3] == ["review", "prompt for b.py", REVIEW.model_dump_json()]
+    assert not any("prompt for a.py" in c for c in contents)
+
+
+def test_question_about_another_shard_starts_over_on_its_host():
+    pool = StubPool(StubEndpoint("http://one"), StubEndpoint("http://two"))
+    followup, provider = session(pool)
+
+    async def scenario() -> None:
+        await followup.ask("what about a.py?")
+        await followup.ask("and b.py?")
+
+    asyncio.run(scenario())
+
+    (first_host, _), (second_host, messages) = provider.calls
+    assert (first_host, second_host) == ("http://one", "http://two")
+    # The conversation about a.py is not carried over.
+    assert [m["content"] for m in messages][1] == "prompt for b.py"
+    assert len(messages) == 4
+
+
+def test_unhealthy_reviewing_host_falls_back_to_the_pool():
+    pool = StubPool(StubEndpoint("http://one"), StubEndpoint("http://two", False))
+    followup, provider = session(pool)
+
+    asyncio.run(followup.ask("why is b.py:3 a bug?"))
+
+    [(host, _)] = provider.calls
+    assert host == "http://one"
+    assert pool.leased == ["http://one"]
@@ -0,0 +1,99 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from git_agent.domain.models import GitDiff
+from git_agent.infra.git import GitAdapter, parse_diff
+
+BODY = "".join(f"line {n}\n" for n in range(1, 21))
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    git(tmp_path, "init", "-q")
+    (tmp_path / "kept.py").write_text(BODY)
+    (tmp_path / "old_name.py").write_text(BODY)
+    (tmp_path / "gone.txt").write_text("bye\n")
+    (tmp_path / "image.bin").write_bytes(b"\0\1\2")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "init")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def staged_diff() -> GitDiff:
+    result = GitAdapter().get_diff()
+    assert result.success, result.message
+    return result.value
+
+
+def test_modified_file_hunks(repo):
+    lines = BODY.splitlines(keepends=True)
+    lines[4] = "changed 5\n"
+    del lines[9:11]
+    (repo / "kept.py").write_text("".join(lines))
+    git(repo, "add", "kept.py")
+
+    [diff] = staged_diff().files
+    assert (diff.path, diff.additions, diff.deletions) == ("kept.py", 1, 3)
+    assert not (diff.is_new or diff.is_deleted or diff.is_binary or diff.is_rename)
+    assert [
+        (h.old_start, h.old_count, h.new_start, h.new_count) for h in diff.hunks
+    ] == [(5, 1, 5, 1), (10, 2, 9, 0)]
+    assert diff.patch.startswith("diff --git a/kept.py b/kept.py")
+
+
+def test_rename_with_edit(repo):
+    git(repo, "mv", "old_name.py", "new name.py")
+    (repo / "new name.py").write_text(BODY + "line 21\n")
+    git(repo, "add", "new name.py")
+
+    [diff] = staged_diff().files
+    assert diff.path == "new name.py"
+    assert diff.old_path == "old_name.py"
+    assert diff.is_rename
+    assert (diff.additions, diff.deletions) == (1, 0)
+
+
+def test_binary_file(repo):
+    (repo / "image.bin").write_bytes(b"\0\3\4\5")
+    git(repo, "add", "image.bin")
+
+    [diff] = staged_diff().files
+    assert diff.is_binary
+    assert (diff.additions, diff.deletions) == (0, 0)
+    assert diff.hunks == []
+
+
+def test_deleted_and_new_files_keep_their_patches(repo):
+    git(repo, "rm", "-q", "gone.txt")
+    (repo / "added.py").write_text("x = 1\n")
+    git(repo, "add", "added.py")
+
+    diff = staged_diff()
+    by_path = {f.path: f for f in diff.files}
+    assert diff.files_changed == ["added.py", "gone.txt"]
+
+    gone = by_path["gone.txt"]
+    assert gone.is_deleted and not gone.is_new
+    assert (gone.additions, gone.deletions) == (0, 1)
+    assert "-bye" in gone.patch
+
+    added = by_path["added.py"]
+    assert added.is_new
+    assert [(h.new_start, h.new_count) for h in added.hunks] == [(1, 1)]
+    assert "+x = 1" in added.patch
+
+
+def test_no_changes():
+    assert parse_diff(b"").files == []
@@ -0,0 +1,80 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from git_agent.infra.git_index import GitIndexAdapter
+
+NEWLINE_PATH = "new\nline.py"
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    git(tmp_path, "init", "-q")
+    (tmp_path / "plain.py").write_text("x = 1\n")
+    (tmp_path / "with space.py").write_text("y = 2\n")
+    (tmp_path / NEWLINE_PATH).write_text("z = 3\n")
+    (tmp_path / "image.png.dat").write_bytes(b"\x89PNG\0\1\2")
+    git(tmp_path, "add", ".")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def adapter():
+    with GitIndexAdapter() as adapter:
+        yield adapter
+
+
+def test_reads_staged_content_not_worktree(repo, adapter):
+    (repo / "plain.py").write_text("x = 'unstaged'\n")
+
+    result = adapter.read_file("plain.py")
+    assert result.success
+    assert result.value.content == "x = 1"
+
+
+def test_paths_with_spaces_and_newlines(adapter, repo):
+    results = adapter.read_files(["with space.py", NEWLINE_PATH, "plain.py"])
+
+    assert {path: r.value.content for path, r in results.items()} == {
+        "with space.py": "y = 2",
+        NEWLINE_PATH: "z = 3",
+        "plain.py": "x = 1",
+    }
+
+
+def test_missing_path_does_not_shift_later_answers(adapter, repo):
+    results = adapter.read_files(["gone.py", "plain.py", "new\ngone.py"])
+
+    assert not results["gone.py"].success
+    assert not results["new\ngone.py"].success
+    assert results["plain.py"].value.content == "x = 1"
+
+
+def test_binary_blob_is_skipped(adapter, repo):
+    results = adapter.read_files(["image.png.dat", "plain.py"])
+
+    assert results["image.png.dat"].success
+    assert results["image.png.dat"].value is None
+    assert results["image.png.dat"].message == "Binary file"
+    assert results["plain.py"].value.content == "x = 1"
+
+
+def test_process_is_reused_across_calls(adapter, repo):
+    adapter.read_file("plain.py")
+    process = adapter._process
+    adapter.read_file("with space.py")
+    assert adapter._process is process
+
+    adapter.close()
+    assert adapter._process is None
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from git_agent.infra.json_stream import IncrementalJSONScanner, replay
+
+REVIEW = json.dumps(
+    {
+        "summary": 'Quotes "inside" and a brace } in text',
+        "critical_bugs": [
+            {"file": "a.py", "description": "ends with a backslash \\"},
+            {"file": "b.py", "description": "has ] and [ in it"},
+        ],
+        "warnings": [],
+        "approval_status": "rejected",
+    }
+)
+
+
+def scan(chunks: list[str]) -> tuple[IncrementalJSONScanner, list[tuple[str, str]]]:
+    items: list[tuple[str, str]] = []
+    scanner = IncrementalJSONScanner(lambda key, raw: items.append((key, raw)))
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return scanner, items
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(REVIEW)])
+def test_reports_items_and_completion_across_chunk_boundaries(size):
+    chunks = [REVIEW[i : i + size] for i in range(0, len(REVIEW), size)]
+    scanner, items = scan(chunks)
+
+    assert scanner.done
+    assert json.loads(scanner.text) == json.loads(REVIEW)
+    assert [key for key, _ in items] == ["critical_bugs", "critical_bugs"]
+    assert [json.loads(raw)["file"] for _, raw in items] == ["a.py", "b.py"]
+
+
+def test_escaped_quote_does_not_end_string():
+    scanner, _ = scan(['{"summary": "say \\"}\\" twice"', "}"])
+    assert scanner.done
+    assert json.loads(scanner.text)["summary"] == 'say "}" twice'
+
+
+def test_escape_split_across_chunks():
+    scanner, _ = scan(['{"summary": "a\\', '"}', '"}'])
+    assert scanner.done
+    assert json.loads(scanner.text)["summary"] == 'a"}'
+
+
+def test_truncated_string_is_not_complete():
+    scanner, items = scan(['{"summary": "cut off inside a string } ]'])
+    assert not scanner.done
+    assert items == []
+
+
+def test_truncated_array_reports_only_closed_items():
+    text = '{"warnings": [{"file": "a.py"}, {"file": "b.'
+    scanner, items = scan([text])
+    assert not scanner.done
+    assert scanner.text == text
+    assert items == [("warnings", '{"file": "a.py"}')]
+
+
+def test_stops_at_end_of_top_level_object():
+    scanner, _ = scan(['{"summary": "ok"} trailing', " text"])
+    assert scanner.done
+    assert scanner.text == '{"summary": "ok"}'
+    assert scanner.feed("{}")
+
+
+def test_replay_fires_callbacks():
+    items: list[tuple[str, str]] = []
+    replay(REVIEW, lambda key, raw: items.append((key, raw)))
+    assert len(items) == 2
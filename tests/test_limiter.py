@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from git_agent.application.limiter import AdaptiveLimiter
+from git_agent.domain.models import ServerTiming
+
+SERVICE_SECONDS = 0.02
+
+
+class QueueingServer:
+    """Runs `parallel` requests at once and queues the rest, like Ollama does."""
+
+    def __init__(self, parallel: int):
+        self.running = asyncio.Semaphore(parallel)
+
+    async def handle(self) -> ServerTiming:
+        arrived = time.monotonic()
+        async with self.running:
+            queued = time.monotonic() - arrived
+            await asyncio.sleep(SERVICE_SECONDS)
+        return ServerTiming(queued, SERVICE_SECONDS)
+
+
+async def drive(limiter: AdaptiveLimiter, report_timing: bool) -> list[int]:
+    server = QueueingServer(parallel=2)
+    limits: list[int] = []
+
+    async def request(model: str) -> None:
+        async with limiter.slot(model) as slot:
+            timing = await server.handle()
+            if report_timing:
+                slot.timing = timing
+        limits.append(limiter.limit)
+
+    await asyncio.gather(*(request(m) for m in ["a", "b"] * 40))
+    return limits
+
+
+def test_limit_stays_near_server_parallelism_when_it_queues():
+    limits = asyncio.run(drive(AdaptiveLimiter(max_limit=8), report_timing=True))
+
+    # Slow start overshoots once, since queueing shows a round trip late.
+    steady = limits[20:]
+    assert max(steady) <= 4
+    assert min(steady) >= 2
+
+
+def test_limit_grows_to_max_without_a_queueing_signal():
+    limits = asyncio.run(drive(AdaptiveLimiter(max_limit=8), report_timing=False))
+
+    assert limits[-1] == 8
+
+
+def test_congestion_error_halves_limit():
+    limiter = AdaptiveLimiter(initial=8, max_limit=8)
+
+    async def failing() -> None:
+        async with limiter.slot("a"):
+            raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(failing())
+    assert limiter.limit == 4
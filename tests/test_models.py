@@ -0,0 +1,28 @@
+import pytest
+
+from git_agent.domain.models import FileContext, LintScoreIssue
+
+
+def test_file_context_keeps_its_custom_init_with_slots():
+    context = FileContext("python", ["a = 1", "b = 2"])
+
+    assert context.language == "Python"
+    assert context.content == "a = 1\nb = 2"
+    assert context.line_count == 2
+    assert context == FileContext("python", ["a = 1", "b = 2"])
+    assert "line_count=2" in repr(context)
+    assert not hasattr(context, "__dict__")
+    with pytest.raises(AttributeError):
+        context.extra = True
+
+
+def test_lint_score_issue_with_slots():
+    issue = LintScoreIssue("a.py", "python", "ruff", "F401 unused import", line=3)
+
+    assert (issue.file, issue.line, issue.column) == ("a.py", 3, None)
+    assert issue == LintScoreIssue(
+        "a.py", "python", "ruff", "F401 unused import", line=3
+    )
+    assert not hasattr(issue, "__dict__")
+    with pytest.raises(AttributeError):
+        issue.severity = "high"
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from git_agent.infra.endpoint_pool import EndpointPool
+from git_agent.infra.llm_cache import LLMResponseCache
+from git_agent.infra.ollama_llm_provider import PreparedRequest
+from git_agent.infra.openai_llm_provider import AsyncOpenAILLMProvider
+
+MODEL = "tiny"
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Answers chat completions with the request's user message, and records the paths hit."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.paths: list[str] = []
+        self.bodies: list[dict] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInServer
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.paths.append(self.path)
+        self.server.bodies.append(request)
+
+        prompt = request["messages"][-1]["content"]
+        answer = json.dumps({"summary": prompt})
+        body = json.dumps({"choices": [{"message": {"content": answer}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+
+def cache_key(request: PreparedRequest) -> str:
+    # These servers expose no model digest.
+    return LLMResponseCache.key(MODEL, "", request.fingerprint)
+
+
+@pytest.fixture
+def server() -> Iterator[StandInServer]:
+    server = StandInServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_sends_chat_requests_and_skips_cached_ones(server, tmp_path: Path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite3")
+    requests = [
+        AsyncOpenAILLMProvider.prepare(f"shard {n}", system="review") for n in range(3)
+    ]
+
+    async def scenario() -> list[str]:
+        pool = EndpointPool.connect([server.url])
+        provider = AsyncOpenAILLMProvider(
+            model=MODEL, pool=pool, cache=cache, batch_prompts=True
+        )
+        try:
+            cache.put(cache_key(requests[1]), '{"summary": "cached"}')
+            return await provider.generate_batch(requests)
+        finally:
+            await provider.aclose()
+
+    answers = asyncio.run(scenario())
+
+    assert [json.loads(a)["summary"] for a in answers] == [
+        "shard 0",
+        "cached",
+        "shard 2",
+    ]
+    assert server.paths == ["/v1/chat/completions"] * 2
+    # Chat messages let the server apply the model's chat template.
+    assert all(
+        body["messages"][0] == {"role": "system", "content": "review"}
+        for body in server.bodies
+    )
+    # Fresh answers are cached like any other request.
+    assert cache.get(cache_key(requests[2])) is not None
@@ -0,0 +1,40 @@
+import pytest
+
+from git_agent.application.orchestrator import quorum_verdict
+from git_agent.domain.models import ApprovalStatus, CodeReviewResult
+
+APPROVED = ApprovalStatus.Approved
+NEEDS_FIXES = ApprovalStatus.NeedsFixes
+REJECTED = ApprovalStatus.Rejected
+
+
+def reviews(*statuses: ApprovalStatus) -> list[CodeReviewResult]:
+    return [
+        CodeReviewResult(
+            summary="s",
+            commit_proposals=[],
+            approval_status=status,
+            files_reviewed=1,
+            languages_detected=[],
+        )
+        for status in statuses
+    ]
+
+
+@pytest.mark.parametrize(
+    ("statuses", "quorum", "expected"),
+    [
+        ((APPROVED, APPROVED, REJECTED), 2, APPROVED),
+        ((REJECTED, APPROVED, REJECTED), 2, REJECTED),
+        ((APPROVED, NEEDS_FIXES, REJECTED), 2, None),
+        ((APPROVED, APPROVED), 3, None),
+        ((NEEDS_FIXES,), 1, NEEDS_FIXES),
+        ((), 1, None),
+    ],
+)
+def test_quorum_verdict(statuses, quorum, expected):
+    assert quorum_verdict(reviews(*statuses), quorum) == expected
+
+
+def test_quorum_verdict_accepts_any_iterable():
+    assert quorum_verdict(iter(reviews(REJECTED, REJECTED)), 2) == REJECTED
@@ -0,0 +1,130 @@
+import pytest
+
+from git_agent.application.prompt_builder import (
+    ContextMode,
+    PromptBudgetError,
+    PromptBuilder,
+    PromptOptions,
+)
+from git_agent.application.tokens import CharRatioEstimator
+from git_agent.domain.models import (
+    DiffHunk,
+    FileContext,
+    FileDiff,
+    LintScore,
+    LintScoreIssue,
+    ReviewContext,
+)
+
+# One token per character keeps the budget arithmetic readable.
+ESTIMATOR = CharRatioEstimator(1.0)
+LINES = [f"value_{n} = {n}" for n in range(1, 301)]
+
+
+def hunk(line: int, size: int = 1) -> tuple[str, DiffHunk]:
+    old = "".join(f"-old {n}\n" for n in range(size))
+    new = "".join(f"+{LINES[line - 1 + n]}\n" for n in range(size))
+    header = f"@@ -{line},{size} +{line},{size} @@\n"
+    return header + old + new, DiffHunk(line, size, line, size)
+
+
+def context(
+    hunks: list[tuple[str, DiffHunk]], with_file: bool = True, lint: int = 0
+) -> ReviewContext:
+    patch = "diff --git a/big.py b/big.py\n--- a/big.py\n+++ b/big.py\n"
+    patch += "".join(text for text, _ in hunks)
+    file_diff = FileDiff(
+        "big.py",
+        patch,
+        additions=len(hunks),
+        deletions=len(hunks),
+        hunks=[h for _, h in hunks],
+    )
+    issues = [
+        LintScoreIssue("big.py", "python", "ruff", f"finding {n}", line=n)
+        for n in range(1, lint + 1)
+    ]
+    return ReviewContext(
+        diff=patch,
+        files_changed=["big.py"],
+        file_contents={"big.py": FileContext("python", LINES)} if with_file else {},
+        linter_results=LintScore(
+            issues, {"python": issues} if issues else {}, {"ruff"}
+        ),
+        file_diffs={"big.py": file_diff},
+    )
+
+
+def build(ctx: ReviewContext, budget: int | None = None, **options):
+    return PromptBuilder.build_prompt(
+        ctx, "check it", PromptOptions(token_budget=budget, **options), ESTIMATOR
+    )
+
+
+def test_without_budget_everything_is_sent():
+    built = build(context([hunk(10), hunk(200)], lint=3))
+    assert built.dropped == []
+    assert "+value_10 = 10" in built.text
+    assert "300 | value_300 = 300" in built.text
+    assert "finding 3" in built.text
+
+
+def test_generous_budget_drops_nothing():
+    ctx = context([hunk(10), hunk(200)], lint=3)
+    full = build(ctx)
+    built = build(ctx, full.estimated_tokens + 500)
+    assert built.dropped == []
+    assert built.estimated_tokens <= full.estimated_tokens + 500
+
+
+def test_rest_of_file_goes_before_hunk_context():
+    ctx = context([hunk(10), hunk(200)])
+    excerpts = build(ctx, context_mode=ContextMode.Hunks)
+    budget = excerpts.estimated_tokens + 500
+    built = build(ctx, budget)
+
+    assert built.dropped == ["rest-of-file:big.py"]
+    assert built.estimated_tokens <= budget
+    assert "+value_200 = 200" in built.text
+    # The window around each change is still there, the far end of the file is not.
+    assert "205 | value_205 = 205" in built.text
+    assert "300 | value_300 = 300" not in built.text
+
+
+def test_lint_findings_are_dropped_before_the_diff():
+    ctx = context([hunk(10)], with_file=False, lint=200)
+    budget = build(ctx).estimated_tokens // 2
+    built = build(ctx, budget)
+
+    assert built.estimated_tokens <= budget
+    assert "+value_10 = 10" in built.text
+    [lint] = built.dropped
+    assert lint.startswith("lint:")
+    assert "more issue(s) omitted to fit the context window" in built.text
+
+
+def test_diff_is_cut_at_hunk_boundaries():
+    ctx = context([hunk(10, 80), hunk(200, 80)], with_file=False)
+    first_hunk = len(hunk(10, 80)[0])
+    budget = first_hunk + 1000
+    built = build(ctx, budget)
+
+    assert built.estimated_tokens <= budget
+    assert "+value_10 = 10" in built.text
+    assert "+value_200 = 200" not in built.text
+    assert "1 more hunk(s) omitted to fit the context window" in built.text
+    assert built.dropped == ["diff:big.py (1 of 2 hunks)"]
+
+
+def test_diff_that_cannot_fit_raises():
+    ctx = context([hunk(10, 80)], with_file=False)
+    with pytest.raises(PromptBudgetError) as error:
+        build(ctx, 1000)
+    assert error.value.files == ["big.py"]
+
+
+def test_compact_mode_marks_changes_instead_of_repeating_the_diff():
+    built = build(context([hunk(10)]), compact=True)
+    assert "## Git Changes (Diff)" not in built.text
+    assert "changes marked inline" in built.text
+    assert built.saved_tokens > 0
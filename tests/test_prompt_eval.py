@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from git_agent.application.ollama_agent import prepare_review
+from git_agent.application.prompt_builder import PromptLayout, PromptOptions
+from git_agent.application.tokens import CharRatioEstimator
+from git_agent.domain.models import FileContext, LintScore, ReviewContext
+from git_agent.infra.endpoint_pool import EndpointPool
+from git_agent.infra.ollama_llm_provider import AsyncOllamaLLMProvider
+from git_agent.infra.prompt_eval_store import PromptEvalBaselines
+
+MODEL = "tiny"
+PATCH = (
+    "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+)
+CONTEXT = ReviewContext(
+    diff=PATCH,
+    files_changed=["a.py"],
+    file_contents={"a.py": FileContext("python", ["x = 2"])},
+    linter_results=LintScore(issues=[], by_language={}, linters_used=set()),
+)
+
+
+class StandInOllama(ThreadingHTTPServer):
+    """Answers `/api/generate` with the given `prompt_eval_count`s, in order."""
+
+    daemon_threads = True
+
+    def __init__(self, counts: list[int]):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.counts = counts
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInOllama
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        count = self.server.counts.pop(0)
+        body = json.dumps(
+            {
+                "response": "{}",
+                "done": True,
+                "prompt_eval_count": count,
+                # One millisecond per evaluated token.
+                "prompt_eval_duration": count * 1_000_000,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[StandInOllama]:
+    # A full evaluation, then one where Ollama reused all but the new note.
+    server = StandInOllama([1000, 40])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def review_run(url: str, store: Path, note: str) -> AsyncOllamaLLMProvider:
+    """One git-agent run: a fresh provider reading the baselines from `store`."""
+    prepared = prepare_review(
+        CONTEXT,
+        note,
+        PromptOptions(layout=PromptLayout.StableFirst),
+        CharRatioEstimator(4.0),
+    )
+
+    async def scenario() -> AsyncOllamaLLMProvider:
+        provider = AsyncOllamaLLMProvider(
+            model=MODEL,
+            pool=EndpointPool.connect([url]),
+            baselines=PromptEvalBaselines(store),
+        )
+        try:
+            await provider.generate_prepared(prepared.request)
+        finally:
+            await provider.pool.aclose()
+        return provider
+
+    return asyncio.run(scenario())
+
+
+def test_reuse_is_measured_against_an_earlier_run_with_another_note(
+    server, tmp_path: Path
+):
+    store = tmp_path / "prompt_eval.json"
+
+    first = review_run(server.url, store, "check the loop")
+    second = review_run(server.url, store, "now check the naming")
+
+    assert first.prompt_eval.reused_tokens == 0
+    assert second.prompt_eval.reused_tokens == 960
+    assert second.prompt_eval.seconds_saved == pytest.approx(0.96)
+
+
+def test_note_changes_the_fingerprint_but_not_the_stable_one():
+    def request(note: str):
+        options = PromptOptions(layout=PromptLayout.StableFirst)
+        return prepare_review(CONTEXT, note, options, CharRatioEstimator(4.0)).request
+
+    one, other = request("check the loop"), request("now check the naming")
+
+    assert one.fingerprint != other.fingerprint
+    assert one.stable_fingerprint == other.stable_fingerprint
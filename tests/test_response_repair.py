@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from git_agent.application.response_repair import close_truncated_json, repair_review
+from git_agent.domain.models import ApprovalStatus, SeverityLevel
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ('{"summary": "abc', {"summary": "abc"}),
+        # Cut off right after the backslash of an escape, with no earlier comma.
+        ('{"summary": "abc\\', {"summary": "abc"}),
+        ('{"summary": "abc\\u00e', {"summary": "abc"}),
+        # An escaped backslash is complete and stays.
+        ('{"summary": "abc\\\\', {"summary": "abc\\"}),
+        ('{"summary": "say \\"hi', {"summary": 'say "hi'}),
+    ],
+)
+def test_closes_truncated_strings(raw, expected):
+    assert json.loads(close_truncated_json(raw)) == expected
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ('{"langs": ["py", "go"', {"langs": ["py", "go"]}),
+        ('{"langs": ["py", "go",', {"langs": ["py", "go"]}),
+        ('{"langs": ["py", "g', {"langs": ["py", "g"]}),
+        ('{"bugs": [{"line": 1}, {"line":', {"bugs": [{"line": 1}]}),
+        ('{"bugs": [{"line": 1}, {"li', {"bugs": [{"line": 1}]}),
+    ],
+)
+def test_closes_truncated_arrays(raw, expected):
+    assert json.loads(close_truncated_json(raw)) == expected
+
+
+def test_escaped_quotes_do_not_end_strings():
+    raw = 'Here you go: {"summary": "a \\"}\\" b", "warnings": [],} trailing'
+    assert json.loads(close_truncated_json(raw)) == {
+        "summary": 'a "}" b',
+        "warnings": [],
+    }
+
+
+def test_no_object_returns_none():
+    assert close_truncated_json("no json here") is None
+
+
+def test_repair_review_salvages_issues_of_truncated_response():
+    raw = (
+        '{"summary": "Two bugs", "approval_status": "needs_changes", '
+        '"critical_bugs": [{"file": "a.py", "line": 3, "severity": "high", '
+        '"description": "uses \\"eval\\"", "suggestion": "parse it"}, '
+        '{"file": "b.py", "line": 9, "description": "cut off \\'
+    )
+    repaired = repair_review(raw)
+    result = repaired.to_result()
+
+    assert repaired.missing == []
+    assert result.approval_status is ApprovalStatus.NeedsFixes
+    first, cut = result.critical_bugs
+    assert first.severity is SeverityLevel.Critical
+    assert first.description == 'uses "eval"'
+    # The issue cut off mid-escape still validates without the dangling backslash.
+    assert (cut.file, cut.description) == ("b.py", "cut off ")
+
+
+def test_repair_review_reports_missing_essentials():
+    repaired = repair_review('{"summary": "cut off before the verdict\\')
+    assert repaired.missing == ["approval_status"]
+    with pytest.raises(ValueError):
+        repaired.to_result()
+
+
+def test_repair_review_rejects_when_critical_bugs_have_no_verdict():
+    raw = (
+        '{"summary": "s", "critical_bugs": [{"file": "a.py", "line": 1, '
+        '"severity": "critical", "description": "d", "suggestion": "x"}]'
+    )
+    assert repair_review(raw).to_result().approval_status is ApprovalStatus.Rejected
+
+
+def test_repair_review_without_json_raises():
+    with pytest.raises(ValueError):
+        repair_review("I cannot review this.")
@@ -0,0 +1,38 @@
+from git_agent.application.scheduler import GIB, LOAD_OVERHEAD, plan_waves
+
+SIZES = {"small:latest": 2 * GIB, "medium:latest": 4 * GIB, "large:latest": 8 * GIB}
+
+
+def test_without_budget_loaded_models_go_first():
+    waves = plan_waves(["small", "medium", "large"], SIZES, {"large:latest": 9 * GIB})
+    assert waves == [["large", "small", "medium"]]
+
+
+def test_budget_packs_first_fit_decreasing():
+    budget = int(11 * GIB)
+    waves = plan_waves(["small", "medium", "large"], SIZES, {}, budget)
+
+    assert waves == [["large"], ["medium", "small"]]
+    for wave in waves:
+        assert sum(SIZES[f"{m}:latest"] * LOAD_OVERHEAD for m in wave) <= budget
+
+
+def test_loaded_models_use_their_loaded_size_and_run_first():
+    loaded = {"medium:latest": 5 * GIB}
+    waves = plan_waves(["small", "medium", "large"], SIZES, loaded, int(8 * GIB))
+    assert waves == [["medium", "small"], ["large"]]
+
+
+def test_model_of_unknown_size_runs_alone():
+    waves = plan_waves(["mystery", "small"], SIZES, {}, int(16 * GIB))
+    assert waves == [["mystery"], ["small"]]
+
+
+def test_model_larger_than_budget_still_runs():
+    waves = plan_waves(["large", "small"], SIZES, {}, int(4 * GIB))
+    assert waves == [["large"], ["small"]]
+
+
+def test_implicit_latest_tag_matches():
+    waves = plan_waves(["small:latest"], SIZES, {"small:latest": GIB})
+    assert waves == [["small:latest"]]